@@ -1,12 +1,14 @@
 from fastapi import APIRouter, HTTPException, Depends, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
-from app.models.user import UserCreate, UserResponse, get_password_hash, verify_password
-from app.db.database import users_collection, parse_json
+from app.models.user import UserCreate, UserResponse, RefreshTokenRequest
+from app.core.passwords import get_password_hash_async
+from app.db.database import user_repository, parse_json
 from bson import ObjectId
+from pymongo.errors import DuplicateKeyError
 from datetime import datetime, timedelta
 
 from typing import Optional
-from app.core.security import ACCESS_TOKEN_EXPIRE_MINUTES, create_access_token,authenticate_user
+from app.core.security import ACCESS_TOKEN_EXPIRE_MINUTES, create_access_token,authenticate_user, invalidate_cached_user, user_token_claims, issue_refresh_token, rotate_refresh_token
 
 
 router = APIRouter()
@@ -15,29 +17,29 @@ router = APIRouter()
 # Kayıt olma endpoint'i
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
 async def register(user: UserCreate):
-    # Email adresinin benzersiz olduğunu kontrol et
-    if users_collection.find_one({"email": user.email}):
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Bu email adresi zaten kullanılıyor"
-        )
-    
     # Kullanıcı verisini hazırla
     user_data = user.dict()
     
     # Şifreyi hashle
     password = user_data.pop("password")
-    user_data["password_hash"] = get_password_hash(password)
+    user_data["password_hash"] = await get_password_hash_async(password)
     
     # Varsayılan değerleri ayarla
     if "is_admin" not in user_data:
         user_data["is_admin"] = False
     
-    # MongoDB'ye ekle
-    result = users_collection.insert_one(user_data)
+    # MongoDB'ye ekle, email benzersizliğini unique indeks kontrol eder
+    try:
+        created_user = await user_repository.insert(user_data)
+    except DuplicateKeyError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Bu email adresi zaten kullanılıyor"
+        )
+    
+    await invalidate_cached_user(created_user["email"])
     
     # Oluşturulan kullanıcıyı döndür
-    created_user = users_collection.find_one({"_id": result.inserted_id})
     created_user["id"] = str(created_user["_id"])
     
     return parse_json(created_user)
@@ -45,7 +47,7 @@ async def register(user: UserCreate):
 # Giriş yapma endpoint'i
 @router.post("/login")
 async def login(form_data: OAuth2PasswordRequestForm = Depends()):
-    user = authenticate_user(form_data.username, form_data.password)
+    user = await authenticate_user(form_data.username, form_data.password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -56,9 +58,23 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends()):
     # Token oluştur
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
-        data={"sub": user["email"]}, expires_delta=access_token_expires
+        data=user_token_claims(user), expires_delta=access_token_expires
+    )
+    refresh_token = await issue_refresh_token(user)
+    
+    return {"access_token": access_token, "refresh_token": refresh_token, "token_type": "bearer"}
+
+# Şifre doğrulamadan (bcrypt olmadan) access token yenileme endpoint'i.
+# Her refresh token tek kullanımlıktır; yanıtta yenisi döner.
+@router.post("/refresh")
+async def refresh(body: RefreshTokenRequest):
+    user, refresh_token = await rotate_refresh_token(body.refresh_token)
+    
+    access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+    access_token = create_access_token(
+        data=user_token_claims(user), expires_delta=access_token_expires
     )
     
-    return {"access_token": access_token, "token_type": "bearer"}
+    return {"access_token": access_token, "refresh_token": refresh_token, "token_type": "bearer"}
 
 # Mevcut kullanıcı bilgilerini alma
@@ -0,0 +1,37 @@
+from fastapi import APIRouter, Depends
+from app.db.database import get_pool_stats, ilan_repository
+from app.core.passwords import get_password_stats
+from app.core.rate_limit import get_rate_limit_stats
+from app.core.security import get_current_admin_user, user_cache, token_version_cache
+from app.core.ilan_store import ilan_store
+
+router = APIRouter()
+
+# MongoDB bağlantı havuzu istatistikleri (sadece yöneticiler için)
+@router.get("/pool")
+async def pool_stats(current_user: dict = Depends(get_current_admin_user)):
+    return get_pool_stats()
+
+# Süreç içi önbellek isabet/ıskalama sayaçları (sadece yöneticiler için)
+@router.get("/cache")
+async def cache_stats(current_user: dict = Depends(get_current_admin_user)):
+    return {
+        "users": user_cache.stats(),
+        "token_versions": token_version_cache.stats(),
+        "ilanlar": ilan_store.stats(),
+    }
+
+# Şifre hashleme havuzunun doluluk ve reddetme sayaçları (sadece yöneticiler için)
+@router.get("/passwords")
+async def password_stats(current_user: dict = Depends(get_current_admin_user)):
+    return get_password_stats()
+
+# İzin verilen ve sınıra takılan istek sayaçları (sadece yöneticiler için)
+@router.get("/rate-limit")
+async def rate_limit_stats(current_user: dict = Depends(get_current_admin_user)):
+    return get_rate_limit_stats()
+
+# Birleştirilen (single-flight) eşzamanlı ilan okumaları (sadece yöneticiler için)
+@router.get("/single-flight")
+async def single_flight_stats(current_user: dict = Depends(get_current_admin_user)):
+    return ilan_repository.single_flight.stats()
@@ -1,14 +1,87 @@
-from fastapi import APIRouter, HTTPException, Depends, Request
-from app.models.models import Ilan, IlanCreate, IlanResponse
-from app.db.database import ilanlar_collection, parse_json, get_next_sequence_value
+import hashlib
+import json
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Depends, Request, Response, Query
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from pymongo.errors import DuplicateKeyError
+from app.models.models import Ilan, IlanCreate, IlanUpdate, IlanResponse, IlanPage, IlanBulkResponse, IlanFacets
+from app.db.database import ilan_repository, ilan_no_allocator, JSONEncoder, ILAN_FILTER_FIELDS
+from app.db.indexes import ILAN_FILTER_COMBINATIONS
+from app.core.config import settings
 from app.core.security import check_ilan_permission
+from app.core.ilan_store import ilan_store, ILAN_RESPONSE_PROJECTION
+from app.core.json_stream import iter_json_array, JSONStreamError, JSONStreamTooLarge
 
 router = APIRouter()
 
+# Liste sayfalama ayarları
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+# Akış (NDJSON) modu ayarları
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+STREAM_BATCH_SIZE = 500
+
+# İstemciler önbellekteki yanıtı her kullanımda ETag ile doğrular
+CONDITIONAL_CACHE_CONTROL = "private, no-cache"
+
+# Liste sorguları yalnızca ilan_no okur; gövdeler hazır yanıt deposundan gelir
+ILAN_NO_PROJECTION = {"_id": 0, "ilan_no": 1}
+
+
+def counter_etag(change_count: int, request: Request):
+    """Liste yanıtları için güçlü ETag; koleksiyon sayacı ve sorgu parametrelerinden üretilir"""
+    query_hash = hashlib.sha1(request.url.query.encode("utf-8")).hexdigest()[:16]
+    return f'"c{change_count}-{query_hash}"'
+
+def etag_matches(request: Request, etag: str):
+    """If-None-Match başlığı verilen ETag'i içeriyor mu (GET için zayıf karşılaştırma)"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    return etag in (tag.strip().removeprefix("W/") for tag in header.split(","))
+
+def not_modified(etag: str):
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": CONDITIONAL_CACHE_CONTROL})
+
+def json_bytes_response(body: bytes, etag: str):
+    """Hazır JSON baytlarını yeniden serileştirmeden gönderir"""
+    return Response(
+        content=body,
+        media_type="application/json",
+        headers={"ETag": etag, "Cache-Control": CONDITIONAL_CACHE_CONTROL}
+    )
+
+def page_body(entries, next_after_ilan_no=None, next_after_score=None):
+    """IlanPage yanıtını hazır ilan gövdelerini birleştirerek kurar"""
+    return b"".join((
+        b'{"items":[',
+        b",".join(body for body, _ in entries),
+        b'],"next_after_ilan_no":',
+        json.dumps(next_after_ilan_no).encode("utf-8"),
+        b',"next_after_score":',
+        json.dumps(next_after_score).encode("utf-8"),
+        b"}",
+    ))
+
+
+async def stream_ilanlar(after_ilan_no: Optional[int] = None, filters: Optional[dict] = None):
+    """İlanları imleçten okundukça tek tek NDJSON satırı olarak üretir"""
+    async for ilan in ilan_repository.iter_all(
+        projection=ILAN_RESPONSE_PROJECTION,
+        after_ilan_no=after_ilan_no,
+        filters=filters,
+        batch_size=STREAM_BATCH_SIZE
+    ):
+        yield json.dumps(ilan, cls=JSONEncoder, ensure_ascii=False) + "\n"
+
 @router.post("/ilanlar/", response_model=IlanResponse)
 async def create_ilan(ilan: IlanCreate, request: Request, current_user: dict = Depends(check_ilan_permission)):
     # Otomatik olarak bir sonraki ilan_no'yu al
-    next_ilan_no = get_next_sequence_value("ilan_id")
+    next_ilan_no = await ilan_no_allocator.next()
     
     # Gelen verileri dict'e çevir ve ilan_no ekle
     ilan_dict = ilan.dict()
@@ -19,50 +92,202 @@ async def create_ilan(ilan: IlanCreate, request: Request, current_user: dict = D
     ilan_dict["user_email"] = current_user.get("email")
     
     # MongoDB'ye ekle
-    result = ilanlar_collection.insert_one(ilan_dict)
+    try:
+        created_ilan = await ilan_repository.insert(ilan_dict)
+    except DuplicateKeyError:
+        raise HTTPException(status_code=409, detail="İlan numarası çakıştı, lütfen tekrar deneyin")
+    
+    # Oluşturulan ilanı döndür; yeni ilan başka worker'ların deposunda olamaz
+    body, etag = await ilan_store.put(created_ilan, broadcast=False)
+    return json_bytes_response(body, etag)
+
+@router.post("/ilanlar/bulk", response_model=IlanBulkResponse)
+async def create_ilanlar_bulk(request: Request, current_user: dict = Depends(check_ilan_permission)):
+    results = []
+    ilanlar = []
+    
+    # Gövdeyi tamamen belleğe almadan dizi elemanlarını tek tek doğrula
+    try:
+        async for item in iter_json_array(request.stream(), max_element_size=settings.bulk_max_item_size):
+            index = len(results)
+            if index >= settings.bulk_max_batch_size:
+                raise HTTPException(
+                    status_code=413,
+                    detail=f"Tek istekte en fazla {settings.bulk_max_batch_size} ilan eklenebilir"
+                )
+            try:
+                ilan_dict = IlanCreate.model_validate(item).dict()
+            except ValidationError as e:
+                errors = "; ".join(
+                    f"{'.'.join(map(str, error['loc']))}: {error['msg']}" if error["loc"] else error["msg"]
+                    for error in e.errors()
+                )
+                results.append({"index": index, "error": errors})
+                continue
+            ilan_dict["user_id"] = current_user.get("id")
+            ilan_dict["user_email"] = current_user.get("email")
+            results.append({"index": index})
+            ilanlar.append(ilan_dict)
+    except JSONStreamTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except JSONStreamError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    if ilanlar:
+        # Tüm geçerli ilanlar için tek bir $inc ile ardışık ilan_no aralığı ayır
+        first_ilan_no, _ = await ilan_no_allocator.reserve(len(ilanlar))
+        for offset, ilan_dict in enumerate(ilanlar):
+            ilan_dict["ilan_no"] = first_ilan_no + offset
+        
+        failures = await ilan_repository.insert_many(ilanlar)
+        
+        # Sonuçları istek sırasına göre eşleştir
+        valid_results = [result for result in results if "error" not in result]
+        for offset, result in enumerate(valid_results):
+            if offset in failures:
+                result["error"] = failures[offset]
+            else:
+                result["ilan_no"] = ilanlar[offset]["ilan_no"]
+                await ilan_store.put(ilanlar[offset], broadcast=False)
+    
+    failed = sum(1 for result in results if "error" in result)
+    return {"inserted": len(results) - failed, "failed": failed, "results": results}
+
+@router.get("/ilanlar/", response_model=IlanPage)
+async def get_ilanlar(
+    request: Request,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    after_ilan_no: Optional[int] = Query(None),
+    stream: bool = Query(False),
+    tur: Optional[str] = Query(None),
+    cins: Optional[str] = Query(None),
+    cinsiyet: Optional[str] = Query(None),
+    yas: Optional[str] = Query(None),
+    bulundugu_yer: Optional[str] = Query(None),
+    q: Optional[str] = Query(None, min_length=1),
+    after_score: Optional[float] = Query(None),
+    current_user: dict = Depends(check_ilan_permission)
+):
+    # Verilen filtreleri eşitlik sorgusuna çevir
+    values = {"tur": tur, "cins": cins, "cinsiyet": cinsiyet, "yas": yas, "bulundugu_yer": bulundugu_yer}
+    filters = {field: values[field] for field in ILAN_FILTER_FIELDS if values[field] is not None}
+    
+    # Yalnızca bir indeksle (IXSCAN + indeksten sıralama) karşılanabilen birleşimler
+    # kabul edilir; metin aramasında filtreler text indeksinden sonra uygulanır
+    if q is None and frozenset(filters) not in ILAN_FILTER_COMBINATIONS:
+        supported = sorted(" + ".join(sorted(combination)) for combination in ILAN_FILTER_COMBINATIONS if combination)
+        raise HTTPException(
+            status_code=400,
+            detail=f"Bu filtre birleşimi desteklenmiyor. Desteklenen birleşimler: {', '.join(supported)}"
+        )
+    
+    # Tam döküm isteniyorsa koleksiyonu bellekte toplamadan akıt
+    if stream or NDJSON_MEDIA_TYPE in request.headers.get("accept", ""):
+        if q is not None:
+            raise HTTPException(status_code=400, detail="Metin araması akış modunda kullanılamaz")
+        return StreamingResponse(stream_ilanlar(after_ilan_no, filters), media_type=NDJSON_MEDIA_TYPE)
     
-    # Oluşturulan ilanı döndür
-    created_ilan = ilanlar_collection.find_one({"_id": result.inserted_id})
-    return parse_json(created_ilan)
+    # Koleksiyon son yanıttan beri değişmediyse liste sorgusu hiç çalıştırılmaz.
+    # Sayaç sorgudan önce okunur; arada bir yazma olursa ETag eski kalır ve
+    # istemci bir sonraki istekte güncel listeyi alır.
+    change_count = await ilan_repository.get_change_count()
+    etag = counter_etag(change_count, request)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    
+    # Metin araması varsa alaka düzeyine göre sıralı bir sayfa getir
+    if q is not None:
+        ilanlar, next_cursor = await ilan_repository.search_page(
+            q, limit, after_score, after_ilan_no, filters, projection=ILAN_NO_PROJECTION
+        )
+        next_after_score, next_after_ilan_no = next_cursor or (None, None)
+    else:
+        # ilan_no'ya göre sıralı bir sayfa getir; sorgu yalnızca indeksten ilan_no okur
+        ilanlar, next_after_ilan_no = await ilan_repository.find_page(
+            limit, after_ilan_no, filters, projection=ILAN_NO_PROJECTION
+        )
+        next_after_score = None
+    # Depo, sayaçtan önce doğrulanmış kayıtları veritabanıyla karşılaştırır; böylece
+    # gövde ETag'in ait olduğu sayaçtan eski olamaz
+    entries = await ilan_store.get_many([ilan["ilan_no"] for ilan in ilanlar], change_count)
+    return json_bytes_response(page_body(entries, next_after_ilan_no, next_after_score), etag)
 
-@router.get("/ilanlar/", response_model=list[IlanResponse])
-async def get_ilanlar(request: Request, current_user: dict = Depends(check_ilan_permission)):
-    # Tüm sonuçları JSON uyumlu formata dönüştür
-    ilanlar = list(ilanlar_collection.find())
-    return parse_json(ilanlar)
+# tur, cins ve şehir bazında ilan sayıları; {ilan_no} yolundan önce tanımlanmalıdır
+@router.get("/ilanlar/facets", response_model=IlanFacets)
+async def get_ilan_facets(
+    request: Request,
+    tur: Optional[str] = Query(None),
+    cins: Optional[str] = Query(None),
+    bulundugu_yer: Optional[str] = Query(None),
+    current_user: dict = Depends(check_ilan_permission)
+):
+    # Sayaçlar da her yazmada değiştiği için koleksiyon sayacı ETag için yeterlidir
+    etag = counter_etag(await ilan_repository.get_change_count(), request)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    
+    values = {"tur": tur, "cins": cins, "bulundugu_yer": bulundugu_yer}
+    filters = {field: value for field, value in values.items() if value is not None}
+    facets = await ilan_repository.get_facets(filters)
+    return json_bytes_response(IlanFacets.model_validate(facets).model_dump_json().encode("utf-8"), etag)
 
 @router.get("/ilanlar/{ilan_no}", response_model=IlanResponse)
 async def get_ilan(ilan_no: int, request: Request, current_user: dict = Depends(check_ilan_permission)):
-    ilan = ilanlar_collection.find_one({"ilan_no": ilan_no})
-    if ilan is None:
+    entry = await ilan_store.get(ilan_no)
+    if entry is None:
         raise HTTPException(status_code=404, detail="İlan bulunamadı")
-    # İlanı JSON uyumlu formata dönüştür
-    return parse_json(ilan)
+    
+    body, etag = entry
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    # Depodaki hazır JSON gövdesi olduğu gibi gönderilir
+    return json_bytes_response(body, etag)
 
 @router.put("/ilanlar/{ilan_no}", response_model=IlanResponse)
 async def update_ilan(ilan_no: int, ilan: IlanCreate, request: Request, current_user: dict = Depends(check_ilan_permission)):
     # İlan numarasını değiştirmeye izin verme
     ilan_dict = ilan.dict()
     
-    # İlan var mı kontrol et
-    existing_ilan = ilanlar_collection.find_one({"ilan_no": ilan_no})
-    if not existing_ilan:
-        raise HTTPException(status_code=404, detail="İlan bulunamadı")
-    
     # Kullanıcı bilgilerini güncelleme
     ilan_dict["user_id"] = current_user.get("id")
     ilan_dict["user_email"] = current_user.get("email")
     
-    # Güncelle
-    result = ilanlar_collection.update_one({"ilan_no": ilan_no}, {"$set": ilan_dict})
+    # Güncelle, ilan yoksa 404 döndür
+    updated_ilan = await ilan_repository.update(ilan_no, ilan_dict)
+    if updated_ilan is None:
+        raise HTTPException(status_code=404, detail="İlan bulunamadı")
     
     # Güncellenmiş ilanı döndür
-    updated_ilan = ilanlar_collection.find_one({"ilan_no": ilan_no})
-    return parse_json(updated_ilan)
+    body, etag = await ilan_store.put(updated_ilan)
+    return json_bytes_response(body, etag)
+
+# İlanı kısmi güncelleme: yalnızca gönderilen alanlar tek bir find_one_and_update ile yazılır
+@router.patch("/ilanlar/{ilan_no}", response_model=IlanResponse)
+async def patch_ilan(ilan_no: int, ilan: IlanUpdate, request: Request, current_user: dict = Depends(check_ilan_permission)):
+    ilan_dict = ilan.dict(exclude_unset=True, exclude_none=True)
+    
+    # Değişecek alan yoksa yazma yapılmaz; version ve değişiklik sayacı artmaz
+    if not ilan_dict:
+        entry = await ilan_store.get(ilan_no)
+        if entry is None:
+            raise HTTPException(status_code=404, detail="İlan bulunamadı")
+        body, etag = entry
+        return json_bytes_response(body, etag)
+    
+    ilan_dict["user_id"] = current_user.get("id")
+    ilan_dict["user_email"] = current_user.get("email")
+    
+    updated_ilan = await ilan_repository.update(ilan_no, ilan_dict)
+    if updated_ilan is None:
+        raise HTTPException(status_code=404, detail="İlan bulunamadı")
+    
+    body, etag = await ilan_store.put(updated_ilan)
+    return json_bytes_response(body, etag)
 
 @router.delete("/ilanlar/{ilan_no}")
 async def delete_ilan(ilan_no: int, request: Request, current_user: dict = Depends(check_ilan_permission)):
-    result = ilanlar_collection.delete_one({"ilan_no": ilan_no})
-    if result.deleted_count == 0:
+    deleted = await ilan_repository.delete(ilan_no)
+    await ilan_store.remove(ilan_no)
+    if not deleted:
         raise HTTPException(status_code=404, detail="İlan bulunamadı")
     return {"message": "İlan silindi"}
\ No newline at end of file
@@ -1,8 +1,10 @@
 from fastapi import APIRouter, HTTPException, Depends, status
-from app.models.user import UserCreate, UserResponse, get_password_hash
-from app.db.database import users_collection, parse_json
+from app.models.user import UserCreate, UserUpdate, UserResponse
+from app.core.passwords import get_password_hash_async
+from app.db.database import user_repository, parse_json
 from bson import ObjectId
-from app.core.security import get_current_user, get_current_admin_user
+from pymongo.errors import DuplicateKeyError
+from app.core.security import get_current_user, get_current_admin_user, invalidate_cached_user
 
 router = APIRouter()
 
@@ -14,7 +16,7 @@ async def read_users_me(current_user: dict = Depends(get_current_user)):
 # Kullanıcı listesi (sadece yöneticiler için)
 @router.get("/users/", response_model=list[UserResponse])
 async def get_users(current_user: dict = Depends(get_current_admin_user)):
-    users = list(users_collection.find())
+    users = await user_repository.find_all()
     for user in users:
         user["id"] = str(user["_id"])
     
@@ -24,7 +26,7 @@ async def get_users(current_user: dict = Depends(get_current_admin_user)):
 @router.get("/users/{user_id}", response_model=UserResponse)
 async def get_user(user_id: str, current_user: dict = Depends(get_current_admin_user)):
     try:
-        user = users_collection.find_one({"_id": ObjectId(user_id)})
+        user = await user_repository.find_by_id(user_id)
     except:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -43,44 +45,87 @@ async def get_user(user_id: str, current_user: dict = Depends(get_current_admin_
 # Kullanıcı güncelleme (sadece yöneticiler için)
 @router.put("/users/{user_id}", response_model=UserResponse)
 async def update_user(user_id: str, user_update: UserCreate, current_user: dict = Depends(get_current_admin_user)):
-    # Kullanıcının var olup olmadığını kontrol et
-    try:
-        existing_user = users_collection.find_one({"_id": ObjectId(user_id)})
-    except:
+    if not ObjectId.is_valid(user_id):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Geçersiz kullanıcı ID formatı"
         )
     
-    if existing_user is None:
+    # Kullanıcı verisini hazırla
+    user_data = user_update.dict()
+    
+    # Şifreyi hashle
+    password = user_data.pop("password")
+    user_data["password_hash"] = await get_password_hash_async(password)
+    
+    # MongoDB'de tek adımda güncelle, email benzersizliğini unique indeks kontrol eder.
+    # Şifre ve yetki değişebileceği için kullanıcının mevcut token'ları iptal edilir.
+    try:
+        previous_user, updated_user = await user_repository.update(user_id, user_data, revoke_tokens=True)
+    except DuplicateKeyError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Bu email adresi zaten kullanılıyor"
+        )
+    
+    if updated_user is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Kullanıcı bulunamadı"
         )
     
-    # Email değişiyorsa, yeni email'in benzersiz olduğunu kontrol et
-    if user_update.email != existing_user["email"]:
-        if users_collection.find_one({"email": user_update.email}):
+    await invalidate_cached_user(previous_user["email"], updated_user["email"], user_id=user_id)
+    
+    # Güncellenmiş kullanıcıyı döndür
+    updated_user["id"] = str(updated_user["_id"])
+    
+    return parse_json(updated_user)
+
+# Kullanıcıyı kısmi güncelleme (sadece yöneticiler için)
+@router.patch("/users/{user_id}", response_model=UserResponse)
+async def patch_user(user_id: str, user_update: UserUpdate, current_user: dict = Depends(get_current_admin_user)):
+    if not ObjectId.is_valid(user_id):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Geçersiz kullanıcı ID formatı"
+        )
+    
+    # Yalnızca gönderilen alanlar yazılır; null değerler değişiklik sayılmaz
+    user_data = user_update.dict(exclude_unset=True, exclude_none=True)
+    
+    if not user_data:
+        user = await user_repository.find_by_id(user_id)
+        if user is None:
             raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Bu email adresi zaten kullanılıyor"
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Kullanıcı bulunamadı"
             )
+        user["id"] = str(user["_id"])
+        return parse_json(user)
     
-    # Kullanıcı verisini hazırla
-    user_data = user_update.dict()
+    # Şifre yalnızca yenisi gönderildiyse hashlenir
+    if "password" in user_data:
+        user_data["password_hash"] = await get_password_hash_async(user_data.pop("password"))
     
-    # Şifreyi hashle
-    password = user_data.pop("password")
-    user_data["password_hash"] = get_password_hash(password)
+    # Şifre, yetki veya email değiştiğinde kullanıcının mevcut token'ları iptal edilir
+    revoke_tokens = any(field in user_data for field in ("password_hash", "is_admin", "email"))
+    
+    try:
+        previous_user, updated_user = await user_repository.update(user_id, user_data, revoke_tokens=revoke_tokens)
+    except DuplicateKeyError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Bu email adresi zaten kullanılıyor"
+        )
     
-    # MongoDB'de güncelle
-    users_collection.update_one(
-        {"_id": ObjectId(user_id)},
-        {"$set": user_data}
-    )
+    if updated_user is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Kullanıcı bulunamadı"
+        )
+    
+    await invalidate_cached_user(previous_user["email"], updated_user["email"], user_id=user_id)
     
-    # Güncellenmiş kullanıcıyı döndür
-    updated_user = users_collection.find_one({"_id": ObjectId(user_id)})
     updated_user["id"] = str(updated_user["_id"])
     
     return parse_json(updated_user)
@@ -89,17 +134,38 @@ async def update_user(user_id: str, user_update: UserCreate, current_user: dict
 @router.delete("/users/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_user(user_id: str, current_user: dict = Depends(get_current_admin_user)):
     try:
-        result = users_collection.delete_one({"_id": ObjectId(user_id)})
+        deleted = await user_repository.delete(user_id)
     except:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Geçersiz kullanıcı ID formatı"
         )
     
-    if result.deleted_count == 0:
+    if not deleted:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Kullanıcı bulunamadı"
+        )
+    
+    await invalidate_cached_user(deleted["email"], user_id=user_id)
+    
+    return None
+
+# Kullanıcının tüm token'larını iptal etme (sadece yöneticiler için)
+@router.post("/users/{user_id}/revoke-tokens", status_code=status.HTTP_204_NO_CONTENT)
+async def revoke_user_tokens(user_id: str, current_user: dict = Depends(get_current_admin_user)):
+    if not ObjectId.is_valid(user_id):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Geçersiz kullanıcı ID formatı"
+        )
+    
+    user = await user_repository.revoke_tokens(user_id)
+    if user is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Kullanıcı bulunamadı"
         )
     
-    return None
\ No newline at end of file
+    await invalidate_cached_user(user["email"], user_id=user_id)
+    return None
@@ -0,0 +1,359 @@
+"""Önbellek arka uçları ve worker'lar arası geçersiz kılma (invalidation) kanalı
+
+Her önbellek (kullanıcılar, token_version'lar, ilan yanıtları) bir arka uç ile
+bir kanalı birleştiren SharedCache örneğidir:
+
+- memory: her worker'ın kendi belleğindeki TTL/LRU önbellek. Bir worker'daki
+  yazma, kanal üzerinden diğer worker'lardaki kopyaları siler.
+- redis: tüm worker'ların paylaştığı tek önbellek. Kanal mesajı alan worker'lar
+  anahtarı yeniden siler; böylece yazma sırasında başka bir worker'ın eski
+  okumasıyla doldurduğu kayıt da temizlenir.
+
+Kanal "local" (süreç içi; tek worker ve testler) veya "redis" (Redis pub/sub)
+olabilir. Kaçırılan bir mesaj olursa kayıt en geç TTL sonunda yenilenir.
+"""
+import asyncio
+import json
+import random
+import time
+import uuid
+from collections import OrderedDict, defaultdict
+
+from app.core.config import settings
+
+try:
+    import redis.asyncio as redis_asyncio
+except ImportError:  # Redis arka ucu ve kanalı kullanılmıyorsa paket gerekmez
+    redis_asyncio = None
+
+
+class TTLCache:
+    """Boyutu sınırlı, süreli (TTL) bir LRU önbellek; izleme için sayaç tutar
+
+    Tek bir worker süreci içinde, event loop üzerinden kullanılır. ttl_jitter
+    (0-1) verilirse her kaydın süresi ttl_seconds'tan en fazla bu oranda
+    rastgele kısaltılır; aynı anda yazılan kayıtların süresi birlikte dolmaz.
+    """
+
+    def __init__(self, max_size, ttl_seconds, ttl_jitter=0.0):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.ttl_jitter = ttl_jitter
+        self._data = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        item = self._data.get(key)
+        if item is None:
+            self.misses += 1
+            return None
+        expires_at, value = item
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key, value):
+        ttl_seconds = self.ttl_seconds
+        if self.ttl_jitter:
+            ttl_seconds *= 1 - random.random() * self.ttl_jitter
+        self._data[key] = (time.monotonic() + ttl_seconds, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def delete(self, key):
+        self._data.pop(key, None)
+
+    def clear(self):
+        self._data.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl_seconds,
+            "ttl_jitter": self.ttl_jitter,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
+
+
+class MemoryCacheBackend:
+    """Worker'a özel bellek içi arka uç; değerler olduğu gibi (serileştirmeden) saklanır"""
+
+    shared = False
+
+    def __init__(self, max_size, ttl_seconds):
+        self._cache = TTLCache(max_size, ttl_seconds)
+
+    async def get(self, key):
+        return self._cache.get(key)
+
+    async def set(self, key, value):
+        self._cache.set(key, value)
+
+    async def delete(self, key):
+        self._cache.delete(key)
+
+    async def clear(self):
+        self._cache.clear()
+
+    def stats(self):
+        return self._cache.stats()
+
+
+class RedisCacheBackend:
+    """Tüm worker'ların paylaştığı Redis arka ucu
+
+    Değerler encode/decode ile bayta çevrilir (varsayılan JSON). Boyut sınırı
+    Redis'in maxmemory politikasına bırakılır; kayıtlar TTL ile silinir.
+    """
+
+    shared = True
+
+    def __init__(self, redis, namespace, ttl_seconds, encode=None, decode=None):
+        self._redis = redis
+        self.namespace = namespace
+        self.ttl_seconds = ttl_seconds
+        self._encode = encode or (lambda value: json.dumps(value).encode("utf-8"))
+        self._decode = decode or json.loads
+        self.hits = 0
+        self.misses = 0
+
+    def _key(self, key):
+        return f"cache:{self.namespace}:{key}"
+
+    async def get(self, key):
+        data = await self._redis.get(self._key(key))
+        if data is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return self._decode(data)
+
+    async def set(self, key, value):
+        await self._redis.set(self._key(key), self._encode(value), ex=self.ttl_seconds)
+
+    async def delete(self, key):
+        await self._redis.delete(self._key(key))
+
+    async def clear(self):
+        async for redis_key in self._redis.scan_iter(match=self._key("*")):
+            await self._redis.delete(redis_key)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "size": None,
+            "max_size": None,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": None,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
+
+
+class LocalInvalidationBus:
+    """Süreç içi geçersiz kılma kanalı; tek worker'lı kurulumlarda ve testlerde
+    Redis pub/sub yerine geçer. Aynı kanal adına bağlı örnekler (ör. testte iki
+    ayrı "worker") birbirinin mesajlarını alır, kendi mesajlarını almaz."""
+
+    _subscribers = defaultdict(list)
+
+    def __init__(self, channel):
+        self.channel = channel
+        self.origin = uuid.uuid4().hex
+        self._handlers = {}
+
+    def subscribe(self, cache_name, handler):
+        self._handlers[cache_name] = handler
+
+    async def start(self):
+        if self not in self._subscribers[self.channel]:
+            self._subscribers[self.channel].append(self)
+
+    async def publish(self, cache_name, key):
+        for bus in list(self._subscribers[self.channel]):
+            if bus is not self:
+                await bus.deliver(cache_name, key)
+
+    async def deliver(self, cache_name, key):
+        handler = self._handlers.get(cache_name)
+        if handler is not None:
+            await handler(key)
+
+    async def close(self):
+        if self in self._subscribers[self.channel]:
+            self._subscribers[self.channel].remove(self)
+
+
+class RedisInvalidationBus(LocalInvalidationBus):
+    """Redis pub/sub üzerinden tüm worker'lara ulaşan geçersiz kılma kanalı"""
+
+    def __init__(self, redis, channel):
+        super().__init__(channel)
+        self._redis = redis
+        self._task = None
+
+    async def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._listen())
+
+    async def _listen(self):
+        # Bağlantı koparsa yeniden abone olunur; aradaki mesajlar TTL ile telafi edilir
+        while True:
+            try:
+                async with self._redis.pubsub(ignore_subscribe_messages=True) as pubsub:
+                    await pubsub.subscribe(self.channel)
+                    async for message in pubsub.listen():
+                        data = json.loads(message["data"])
+                        if data["origin"] != self.origin:
+                            await self.deliver(data["cache"], data["key"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Önbellek kanalı bağlantısı koptu, yeniden bağlanılıyor: {e}")
+                await asyncio.sleep(1)
+
+    async def publish(self, cache_name, key):
+        message = json.dumps({"origin": self.origin, "cache": cache_name, "key": key})
+        try:
+            await self._redis.publish(self.channel, message)
+        except Exception as e:
+            print(f"Önbellek geçersiz kılma mesajı gönderilemedi: {e}")
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+class SharedCache:
+    """Bir önbellek arka ucunu geçersiz kılma kanalıyla birleştirir
+
+    get/set yalnızca bu worker'ın arka ucunu kullanır (okumada doldurma).
+    replace/invalidate yazmalardan sonra çağrılır; diğer worker'lar kanal
+    üzerinden kendi kopyalarını (paylaşılan arka uçta aynı anahtarı) siler.
+
+    Okumada doldururken veritabanı okumasından önce write_seq alınıp set'e
+    verilmelidir; okuma sürerken bir yazma veya geçersiz kılma olduysa eski
+    olabilecek değer önbelleğe yazılmaz.
+    """
+
+    def __init__(self, name, backend, bus):
+        self.name = name
+        self.backend = backend
+        self.bus = bus
+        # Her yazma/geçersiz kılmada (diğer worker'lardan gelenler dahil) artar
+        self._write_seq = 0
+        self.invalidations_sent = 0
+        self.invalidations_received = 0
+        self.stale_fills_skipped = 0
+        bus.subscribe(name, self._on_invalidate)
+
+    @property
+    def write_seq(self):
+        return self._write_seq
+
+    async def _on_invalidate(self, key):
+        self.invalidations_received += 1
+        self._write_seq += 1
+        await self.backend.delete(key)
+
+    async def _broadcast(self, key):
+        self.invalidations_sent += 1
+        await self.bus.publish(self.name, key)
+
+    async def get(self, key):
+        return await self.backend.get(key)
+
+    async def set(self, key, value, write_seq=None):
+        """Okunan değeri saklar; write_seq verildiyse ve o zamandan beri bir yazma
+        olduysa değer atlanır. Değer yazıldıysa True döndürür."""
+        if write_seq is not None and write_seq != self._write_seq:
+            self.stale_fills_skipped += 1
+            return False
+        await self.backend.set(key, value)
+        return True
+
+    async def replace(self, key, value):
+        """Yazmadan sonra güncel değeri saklar, diğer worker'lardaki eski kopyayı siler"""
+        self._write_seq += 1
+        await self.backend.set(key, value)
+        await self._broadcast(key)
+
+    async def invalidate(self, key):
+        """Kaydı bu worker'da ve diğer worker'larda siler"""
+        self._write_seq += 1
+        await self.backend.delete(key)
+        await self._broadcast(key)
+
+    async def clear(self):
+        self._write_seq += 1
+        await self.backend.clear()
+
+    def stats(self):
+        return {
+            "backend": "redis" if self.backend.shared else "memory",
+            **self.backend.stats(),
+            "invalidations_sent": self.invalidations_sent,
+            "invalidations_received": self.invalidations_received,
+            "stale_fills_skipped": self.stale_fills_skipped,
+        }
+
+
+def create_redis_client(redis_url):
+    if redis_asyncio is None:
+        raise RuntimeError("Redis önbellek arka ucu veya kanalı için 'redis' paketi kurulu olmalı")
+    return redis_asyncio.from_url(redis_url)
+
+
+# Önbellek arka uçları ve kanal aynı Redis istemcisini paylaşır; yalnızca
+# ayarlarda Redis seçildiyse oluşturulur
+cache_redis = None
+if "redis" in (settings.cache_backend, settings.cache_invalidation_bus):
+    cache_redis = create_redis_client(settings.cache_redis_url)
+
+if settings.cache_invalidation_bus == "redis":
+    invalidation_bus = RedisInvalidationBus(cache_redis, settings.cache_invalidation_channel)
+elif settings.cache_invalidation_bus == "local":
+    invalidation_bus = LocalInvalidationBus(settings.cache_invalidation_channel)
+else:
+    raise ValueError(f"Bilinmeyen önbellek kanalı: {settings.cache_invalidation_bus}")
+
+
+def create_cache(name, max_size, ttl_seconds, encode=None, decode=None):
+    """Ayarlarda seçilen arka uçla bir önbellek oluşturur; encode/decode yalnızca
+    değerlerin bayta çevrilmesi gereken (Redis) arka uçta kullanılır"""
+    if settings.cache_backend == "redis":
+        backend = RedisCacheBackend(cache_redis, name, ttl_seconds, encode=encode, decode=decode)
+    elif settings.cache_backend == "memory":
+        backend = MemoryCacheBackend(max_size, ttl_seconds)
+    else:
+        raise ValueError(f"Bilinmeyen önbellek arka ucu: {settings.cache_backend}")
+    return SharedCache(name, backend, invalidation_bus)
+
+
+async def start_cache_bus():
+    await invalidation_bus.start()
+
+
+async def close_cache_bus():
+    await invalidation_bus.close()
+    if cache_redis is not None:
+        await cache_redis.aclose()
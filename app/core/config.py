@@ -0,0 +1,82 @@
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+
+class Settings(BaseSettings):
+    """Uygulama ayarları - ortam değişkenlerinden veya .env dosyasından okunur"""
+    model_config = SettingsConfigDict(env_file=".env", extra="ignore")
+
+    # MongoDB bağlantı bilgileri
+    mongo_url: str = "mongodb://localhost:27017/"
+    db_name: str = "sahiplendirme"
+    mongo_server_selection_timeout_ms: int = 5000
+
+    # Bağlantı havuzu ayarları (worker başına)
+    mongo_max_pool_size: int = 100
+    mongo_min_pool_size: int = 10
+    mongo_max_idle_time_ms: int = 60000
+    mongo_wait_queue_timeout_ms: int = 2000
+
+    # Migration kilidinin süresi (python -m app.db.migrations). Kilit her
+    # migration'dan sonra uzatılır; tek bir migration bu süreden uzun sürmemelidir.
+    migration_lock_ttl_seconds: int = 1800
+
+    # Kullanıcı ve token_version önbelleklerinin arka ucu: "memory" (worker başına)
+    # veya "redis" (paylaşılan).
+    # Geçersiz kılma kanalı: "local" (tek worker) veya "redis" (pub/sub); ilan
+    # deposu her zaman worker belleğinde olduğundan birden fazla worker'da kanal
+    # redis olmalıdır. Redis seçenekleri için redis paketi gerekir.
+    cache_backend: str = "memory"
+    cache_invalidation_bus: str = "local"
+    cache_invalidation_channel: str = "cache_invalidation"
+    cache_redis_url: str = "redis://localhost:6379/0"
+
+    # Kimliği doğrulanmış kullanıcı kayıtları için önbellek
+    user_cache_max_size: int = 1024
+    user_cache_ttl_seconds: int = 60
+
+    # Token iptali için kullanıcı başına token_version önbelleği. Kanal mesajı
+    # kaçırılırsa bir token_version artışı en geç bu süre sonunda etkili olur.
+    token_version_cache_max_size: int = 10000
+    token_version_cache_ttl_seconds: int = 30
+
+    # Tek kullanımlık, her yenilemede değişen refresh token'ların geçerlilik süresi
+    refresh_token_expire_days: int = 30
+
+    # İlanların hazır JSON yanıtları (app/core/ilan_store.py), cache_backend'den
+    # bağımsız olarak her zaman worker başına bellekte. Kayıtlar ilk okumada
+    # yüklenir ve TTL sonunda yeniden okunur; her kaydın TTL'i en fazla
+    # ttl_jitter oranında rastgele kısaltılır.
+    ilan_cache_max_size: int = 100000
+    ilan_cache_ttl_seconds: int = 600
+    ilan_cache_ttl_jitter: float = 0.2
+
+    # Toplu ilan ekleme (POST /ilanlar/bulk): istek başına en fazla ilan sayısı ve
+    # tek bir ilanın JSON gövdesindeki en fazla karakter sayısı; aşılırsa 413 döner
+    bulk_max_batch_size: int = 1000
+    bulk_max_item_size: int = 64 * 1024
+
+    # bcrypt işlemleri için thread havuzu ve eşzamanlı işlem sınırı (worker başına)
+    password_hash_workers: int = 4
+    password_hash_max_pending: int = 16
+
+    # İstek sınırlama (token bucket). Tek worker için "memory"; birden fazla
+    # worker'ın aynı sınırları paylaşması için "redis" (redis paketi gerekir)
+    rate_limit_enabled: bool = True
+    rate_limit_backend: str = "memory"
+    rate_limit_redis_url: str = "redis://localhost:6379/0"
+    rate_limit_default_capacity: int = 300
+    rate_limit_default_period_seconds: int = 60
+    # Giriş, kayıt ve token yenileme: IP başına ve giriş/kayıtta hedef email başına
+    rate_limit_auth_capacity: int = 20
+    rate_limit_auth_email_capacity: int = 5
+    rate_limit_auth_period_seconds: int = 60
+
+    # Üretim sunucusu (python -m app.server) ayarları
+    server_host: str = "0.0.0.0"
+    server_port: int = 8000
+    server_workers: int = 0  # 0: CPU sayısı kadar worker (önbellek kanalı local ise 1)
+    server_max_requests: int = 10000  # bu kadar istekten sonra worker yenilenir, 0: sınırsız
+    server_max_requests_jitter: int = 1000  # her worker'ın sınırına eklenen en fazla rastgele istek sayısı
+
+
+settings = Settings()
@@ -0,0 +1,181 @@
+"""İlanların hazır (serileştirilmiş) JSON yanıtlarının bellek içi deposu
+
+Her ilan IlanResponse modeline göre yalnızca yazıldığında veya ilk okunduğunda
+bir kez JSON'a çevrilir. Tek ilan ve liste yanıtları bu baytların
+birleştirilmesiyle kurulur; istek başına BSON -> dict -> model -> JSON
+dönüşümü yapılmaz. Listelerde MongoDB'den yalnızca ilan_no değerleri okunur.
+
+Depo her worker'da boş başlar (açılış veri miktarından bağımsızdır), ilk
+okumalarda doldurulur ve yazmalarla güncellenir. Başka bir worker'daki yazma
+önbellek kanalı üzerinden kaydı siler; kayıt bir sonraki okumada yeniden
+yüklenir. Kaçırılan mesajlara karşı kayıtlar TTL ile yenilenir; TTL'ler
+rastgele kısaltıldığı için birlikte yüklenen kayıtlar birlikte yenilenmez.
+
+Liste yanıtları koleksiyonun değişiklik sayacına göre ETag alır. Kaçırılan bir
+kanal mesajı yüzünden eski bir gövdenin yeni bir ETag ile gönderilmemesi için
+her kayıt hangi sayaç değerinde doğrulandığını tutar. Liste okunurken sayaç
+kayıttan sonra ilerlemişse sayfadaki kayıtların version'ları tek sorguda
+kontrol edilir ve değişmiş olanlar yeniden yüklenir.
+
+Depo her zaman worker belleğindedir; cache_backend ayarı (redis) yalnızca
+kullanıcı ve token_version önbelleklerini etkiler. Hazır baytların Redis'ten
+okunması, bellekteki depoya göre istek başına bir ağ gidiş-dönüşü ekler.
+Birden fazla worker için redis geçersiz kılma kanalı gerekir (bkz. app/server.py).
+"""
+from app.core.cache import TTLCache, invalidation_bus
+from app.core.config import settings
+from app.db.database import ilan_repository
+from app.models.models import IlanResponse
+
+# Yanıtta yalnızca IlanResponse alanları döner (_id, user_id gibi alanlar hariç)
+ILAN_RESPONSE_PROJECTION = {"_id": 0, **{field: 1 for field in IlanResponse.model_fields}}
+
+# Depodaki kayıtların güncelliği kontrol edilirken yalnızca version okunur
+ILAN_VERSION_PROJECTION = {"_id": 0, "ilan_no": 1, "version": 1}
+
+
+def ilan_etag(ilan: dict):
+    """Tek ilan için güçlü ETag; ilan her değiştiğinde version artar"""
+    return f'"{ilan["ilan_no"]}-{ilan.get("version", 0)}"'
+
+
+def serialize_ilan_response(ilan: dict):
+    """İlanı yanıt modeline göre bir kez serileştirir, (gövde, ETag) döndürür"""
+    return IlanResponse.model_validate(ilan).model_dump_json().encode("utf-8"), ilan_etag(ilan)
+
+
+class StoreEntry:
+    """Depodaki bir ilan: hazır gövde, ETag, version ve doğrulandığı değişiklik sayacı"""
+
+    __slots__ = ("body", "etag", "version", "verified_at")
+
+    def __init__(self, ilan: dict, verified_at=0):
+        self.body, self.etag = serialize_ilan_response(ilan)
+        self.version = ilan.get("version", 0)
+        self.verified_at = verified_at
+
+    def response(self):
+        return self.body, self.etag
+
+
+class IlanBytesStore:
+    """ilan_no -> (JSON gövdesi, ETag) deposu; yalnızca worker belleğinde tutulur"""
+
+    def __init__(self, name, repository, bus, max_size, ttl_seconds, ttl_jitter=0.0):
+        self.name = name
+        self.repository = repository
+        self.bus = bus
+        self._entries = TTLCache(max_size, ttl_seconds, ttl_jitter)
+        # Her yazma/silme/geçersiz kılmada artar; okuma sürerken bir yazma olduysa
+        # okunan (eski olabilecek) belge depoya yazılmaz
+        self._write_seq = 0
+        # Depo kayıtlarının doğrulandığı en yüksek değişiklik sayacı
+        self.synced_change_count = 0
+        self.invalidations_received = 0
+        self.revalidations = 0
+        self.stale_reloads = 0
+        bus.subscribe(name, self._on_invalidate)
+
+    async def _on_invalidate(self, ilan_no):
+        self.invalidations_received += 1
+        self._write_seq += 1
+        self._entries.delete(ilan_no)
+
+    async def get(self, ilan_no):
+        """İlanın hazır yanıtını döndürür; depoda yoksa veritabanından yükler, ilan yoksa None"""
+        entry = self._entries.get(ilan_no)
+        if entry is None:
+            write_seq = self._write_seq
+            ilan = await self.repository.find_by_no(ilan_no)
+            if ilan is None:
+                return None
+            entry = StoreEntry(ilan)
+            if write_seq == self._write_seq:
+                self._entries.set(ilan_no, entry)
+        return entry.response()
+
+    async def _revalidate(self, entries, change_count):
+        """change_count'tan önce doğrulanmış kayıtların version'larını tek sorguda
+        kontrol eder; değişmemiş olanları günceller, değişmiş veya silinmiş olanları
+        depodan çıkarıp numaralarını döndürür"""
+        self.revalidations += 1
+        ilanlar = await self.repository.find_by_nos(list(entries), projection=ILAN_VERSION_PROJECTION)
+        versions = {ilan["ilan_no"]: ilan.get("version", 0) for ilan in ilanlar}
+        stale = []
+        for ilan_no, entry in entries.items():
+            if versions.get(ilan_no) == entry.version:
+                entry.verified_at = max(entry.verified_at, change_count)
+            else:
+                self._entries.delete(ilan_no)
+                stale.append(ilan_no)
+        self.stale_reloads += len(stale)
+        return stale
+
+    async def get_many(self, ilan_nos, change_count=None):
+        """Verilen sıradaki ilanların hazır yanıtlarını döndürür; depoda olmayanlar tek
+        sorguda yüklenir, bu arada silinmiş olanlar atlanır.
+
+        change_count (sorgudan önce okunan değişiklik sayacı) verilirse, bu değerden
+        önce doğrulanmış kayıtlar veritabanıyla karşılaştırılır; böylece dönen
+        gövdeler en az bu sayaç kadar günceldir."""
+        entries = {}
+        missing = []
+        unverified = {}
+        for ilan_no in ilan_nos:
+            entry = self._entries.get(ilan_no)
+            if entry is None:
+                missing.append(ilan_no)
+            else:
+                entries[ilan_no] = entry
+                if change_count is not None and entry.verified_at < change_count:
+                    unverified[ilan_no] = entry
+        write_seq = self._write_seq
+        if unverified:
+            for ilan_no in await self._revalidate(unverified, change_count):
+                del entries[ilan_no]
+                missing.append(ilan_no)
+        if missing:
+            for ilan in await self.repository.find_by_nos(missing, projection=ILAN_RESPONSE_PROJECTION):
+                entry = StoreEntry(ilan, change_count or 0)
+                if write_seq == self._write_seq:
+                    self._entries.set(ilan["ilan_no"], entry)
+                entries[ilan["ilan_no"]] = entry
+        if change_count is not None:
+            self.synced_change_count = max(self.synced_change_count, change_count)
+        return [entries[ilan_no].response() for ilan_no in ilan_nos if ilan_no in entries]
+
+    async def put(self, ilan: dict, broadcast=True):
+        """Yazılan ilanın yanıtını günceller ve döndürür. Yeni eklenen ilanlar diğer
+        worker'larda bulunamayacağı için broadcast=False ile kanal atlanabilir."""
+        entry = StoreEntry(ilan)
+        self._write_seq += 1
+        self._entries.set(ilan["ilan_no"], entry)
+        if broadcast:
+            await self.bus.publish(self.name, ilan["ilan_no"])
+        return entry.response()
+
+    async def remove(self, ilan_no):
+        """Silinen ilanı bu worker'dan ve diğer worker'lardan kaldırır"""
+        self._write_seq += 1
+        self._entries.delete(ilan_no)
+        await self.bus.publish(self.name, ilan_no)
+
+    def stats(self):
+        return {
+            "backend": "memory",
+            **self._entries.stats(),
+            "invalidations_received": self.invalidations_received,
+            "synced_change_count": self.synced_change_count,
+            "revalidations": self.revalidations,
+            "stale_reloads": self.stale_reloads,
+        }
+
+
+ilan_store = IlanBytesStore(
+    "ilanlar",
+    ilan_repository,
+    invalidation_bus,
+    settings.ilan_cache_max_size,
+    settings.ilan_cache_ttl_seconds,
+    settings.ilan_cache_ttl_jitter,
+)
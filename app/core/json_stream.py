@@ -0,0 +1,113 @@
+import codecs
+import json
+
+NUMBER_DELIMITERS = " \t\r\n,]"
+
+
+class JSONStreamError(ValueError):
+    """Akış halinde okunan JSON gövdesi geçersiz olduğunda fırlatılır"""
+
+
+class JSONStreamTooLarge(JSONStreamError):
+    """Dizinin tek bir elemanı izin verilen boyutu aştığında fırlatılır"""
+
+
+async def iter_json_array(chunks, max_element_size=None):
+    """Parça parça gelen bir JSON dizisinin elemanlarını, gövdenin tamamını
+    belleğe almadan tek tek üretir. Tamponda yalnızca henüz işlenmemiş kısım tutulur.
+
+    max_element_size verilirse tek bir eleman bu kadar karakteri aştığında
+    JSONStreamTooLarge fırlatılır; tampon bu sınırın yaklaşık iki katını geçmez.
+    """
+    decoder = json.JSONDecoder()
+    utf8_decoder = codecs.getincrementaldecoder("utf-8")()
+    buffer = ""
+    position = 0
+    finished = False
+
+    async def read_more():
+        nonlocal buffer, position, finished
+        try:
+            try:
+                text = utf8_decoder.decode(await chunks.__anext__())
+            except StopAsyncIteration:
+                text = utf8_decoder.decode(b"", final=True)
+                finished = True
+        except UnicodeDecodeError:
+            raise JSONStreamError("Gövde geçerli UTF-8 değil")
+        buffer = buffer[position:] + text
+        position = 0
+
+    async def read_until(size):
+        """En az bir parça, ardından işlenmemiş kısım size karaktere ulaşana (veya veri bitene) kadar okur"""
+        while True:
+            await read_more()
+            if finished or len(buffer) - position >= size:
+                return
+
+    def check_element_size(size):
+        if max_element_size is not None and size > max_element_size:
+            raise JSONStreamTooLarge(f"Dizi elemanı en fazla {max_element_size} karakter olabilir")
+
+    async def next_char():
+        """Boşlukları atlayıp sıradaki karakteri döndürür, veri bittiyse None"""
+        nonlocal position
+        while True:
+            while position < len(buffer) and buffer[position] in " \t\r\n":
+                position += 1
+            if position < len(buffer):
+                return buffer[position]
+            if finished:
+                return None
+            await read_more()
+
+    if await next_char() != "[":
+        raise JSONStreamError("Gövde bir JSON dizisi olmalı")
+    position += 1
+
+    count = 0
+    while True:
+        char = await next_char()
+        if char is None:
+            raise JSONStreamError("JSON dizisi beklenmedik şekilde bitti")
+
+        if char == "]":
+            position += 1
+            if await next_char() is not None:
+                raise JSONStreamError("JSON dizisinden sonra beklenmeyen veri")
+            return
+
+        if count > 0:
+            if char != ",":
+                raise JSONStreamError("Dizi elemanları arasında ',' bekleniyordu")
+            position += 1
+            char = await next_char()
+            if char is None or char == "]":
+                raise JSONStreamError("',' işaretinden sonra eleman bekleniyordu")
+
+        # Eleman tamamlanana kadar yeni parçalar oku. Başarısız her denemeden sonra
+        # işlenmemiş kısım iki katına çıkana kadar okunur; böylece büyük bir eleman
+        # her parçada baştan ayrıştırılmaz ve toplam maliyet doğrusal kalır.
+        while True:
+            try:
+                value, end = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                if finished:
+                    raise JSONStreamError("Geçersiz JSON elemanı")
+                # Eleman tamamlanmadığı için tamponun geri kalanının tamamı ona aittir
+                pending = len(buffer) - position
+                check_element_size(pending)
+                await read_until(2 * pending)
+                continue
+            # Sayılar parça sınırında kesilmiş olabilir ("45" + ".5"); ardından
+            # bir ayraç görülene kadar tamamlanmış sayılmaz
+            is_number = isinstance(value, (int, float)) and not isinstance(value, bool)
+            if is_number and not finished and (end == len(buffer) or buffer[end] not in NUMBER_DELIMITERS):
+                await read_more()
+                continue
+            break
+
+        check_element_size(end - position)
+        position = end
+        count += 1
+        yield value
@@ -0,0 +1,56 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from fastapi import HTTPException, status
+from app.core.config import settings
+from app.models.user import verify_password, get_password_hash
+
+# bcrypt hesaplama sırasında GIL'i bıraktığı için thread havuzu yeterlidir;
+# böylece her şifre işlemi (~100-300 ms) event loop'u bloklamaz
+password_executor = ThreadPoolExecutor(
+    max_workers=settings.password_hash_workers,
+    thread_name_prefix="bcrypt"
+)
+
+# Çalışan ve sırada bekleyen toplam şifre işlemi sınırı; dolduğunda istek
+# sonsuza kadar beklemek yerine hemen 503 alır
+password_slots = asyncio.Semaphore(settings.password_hash_max_pending)
+
+password_stats = {"in_flight": 0, "completed": 0, "rejected": 0}
+
+
+async def run_password_task(func, *args):
+    """Şifre işlemini thread havuzunda çalıştırır; kapasite doluysa 503 fırlatır"""
+    if password_slots.locked():
+        password_stats["rejected"] += 1
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Sunucu şu anda yoğun, lütfen kısa bir süre sonra tekrar deneyin",
+            headers={"Retry-After": "1"},
+        )
+    async with password_slots:
+        password_stats["in_flight"] += 1
+        try:
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(password_executor, func, *args)
+        finally:
+            password_stats["in_flight"] -= 1
+    password_stats["completed"] += 1
+    return result
+
+
+async def verify_password_async(plain_password, hashed_password):
+    """Düz metin şifreyi event loop dışında hash ile karşılaştırır"""
+    return await run_password_task(verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password):
+    """Şifreyi event loop dışında hashler"""
+    return await run_password_task(get_password_hash, password)
+
+
+def get_password_stats():
+    return {
+        "workers": settings.password_hash_workers,
+        "max_pending": settings.password_hash_max_pending,
+        **password_stats,
+    }
@@ -0,0 +1,266 @@
+"""İstek sınırlama (rate limiting) middleware'i
+
+Her kural için istemci IP'sine göre, giriş ve kayıt isteklerinde ayrıca hedef
+email adresine göre token bucket uygulanır. Kova dolduğunda istek uygulamaya
+ulaşmadan 429 ve Retry-After başlığıyla reddedilir; böylece şifre doğrulamayı
+(bcrypt) tetikleyen uç noktalar CPU'yu tüketmek için kullanılamaz.
+
+Kova durumu değiştirilebilir bir arka uçta tutulur: tek worker için süreç içi
+bellek, birden fazla worker için tüm worker'ların paylaştığı Redis.
+"""
+import json
+import math
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from urllib.parse import parse_qs
+
+from starlette.responses import JSONResponse
+
+from app.core.config import settings
+
+try:
+    import redis.asyncio as redis_asyncio
+except ImportError:  # Redis arka ucu kullanılmıyorsa paket gerekmez
+    redis_asyncio = None
+
+# Email okumak için tamponlanan en büyük istek gövdesi; daha büyük gövdelerde
+# yalnızca IP sınırı uygulanır
+MAX_BUFFERED_BODY_SIZE = 64 * 1024
+
+
+@dataclass(frozen=True)
+class RateLimitRule:
+    """Bir uç nokta grubu için sınır: period_seconds içinde en fazla capacity istek"""
+    name: str
+    capacity: int
+    period_seconds: float
+    email_capacity: int = 0  # 0 ise email'e göre sınır uygulanmaz
+
+    @property
+    def refill_per_second(self):
+        return self.capacity / self.period_seconds
+
+    @property
+    def email_refill_per_second(self):
+        return self.email_capacity / self.period_seconds
+
+
+class MemoryRateLimitBackend:
+    """Süreç içi token bucket deposu; tek worker'lı kurulumlar ve yerel geliştirme için
+
+    Kovalar event loop üzerinde await edilmeden güncellendiği için kilide gerek yoktur.
+    En uzun süre kullanılmayan kovalar max_keys aşıldığında atılır.
+    """
+
+    def __init__(self, max_keys=100000):
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()
+
+    async def acquire(self, key, capacity, refill_per_second):
+        """Kovadan bir token almaya çalışır; izin verilirse 0, verilmezse beklenmesi gereken saniyeyi döndürür"""
+        now = time.monotonic()
+        tokens, updated_at = self._buckets.get(key, (capacity, now))
+        tokens = min(capacity, tokens + (now - updated_at) * refill_per_second)
+
+        if tokens >= 1:
+            retry_after = 0
+            tokens -= 1
+        else:
+            retry_after = (1 - tokens) / refill_per_second
+
+        self._buckets[key] = (tokens, now)
+        self._buckets.move_to_end(key)
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        return retry_after
+
+    async def close(self):
+        self._buckets.clear()
+
+
+# Kovayı Redis üzerinde tek adımda (atomik) okuyup güncelleyen betik.
+# Zaman Redis sunucusundan alınır, böylece worker saatleri arasındaki fark önemsizdir.
+TOKEN_BUCKET_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local refill = tonumber(ARGV[2])
+local time = redis.call('TIME')
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'updated_at')
+local tokens = tonumber(bucket[1]) or capacity
+local updated_at = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + (now - updated_at) * refill)
+
+local retry_after = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    retry_after = (1 - tokens) / refill
+end
+
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'updated_at', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / refill * 1000))
+return tostring(retry_after)
+"""
+
+
+class RedisRateLimitBackend:
+    """Tüm worker'ların paylaştığı token bucket deposu; redis paketi gerekir"""
+
+    def __init__(self, redis_url, key_prefix="rate_limit:"):
+        if redis_asyncio is None:
+            raise RuntimeError("Redis rate limit arka ucu için 'redis' paketi kurulu olmalı")
+        self.key_prefix = key_prefix
+        self._redis = redis_asyncio.from_url(redis_url)
+        self._script = self._redis.register_script(TOKEN_BUCKET_SCRIPT)
+
+    async def acquire(self, key, capacity, refill_per_second):
+        retry_after = await self._script(keys=[self.key_prefix + key], args=[capacity, refill_per_second])
+        return float(retry_after)
+
+    async def close(self):
+        await self._redis.aclose()
+
+
+def create_rate_limit_backend():
+    """Ayarlarda seçilen arka ucu oluşturur"""
+    if settings.rate_limit_backend == "redis":
+        return RedisRateLimitBackend(settings.rate_limit_redis_url)
+    if settings.rate_limit_backend == "memory":
+        return MemoryRateLimitBackend()
+    raise ValueError(f"Bilinmeyen rate limit arka ucu: {settings.rate_limit_backend}")
+
+
+# Şifre doğrulayan veya hashleyen uç noktalar daha sıkı sınırlanır
+AUTH_RULE = RateLimitRule(
+    "auth",
+    capacity=settings.rate_limit_auth_capacity,
+    period_seconds=settings.rate_limit_auth_period_seconds,
+    email_capacity=settings.rate_limit_auth_email_capacity,
+)
+REFRESH_RULE = RateLimitRule(
+    "refresh",
+    capacity=settings.rate_limit_auth_capacity,
+    period_seconds=settings.rate_limit_auth_period_seconds,
+)
+DEFAULT_RULE = RateLimitRule(
+    "api",
+    capacity=settings.rate_limit_default_capacity,
+    period_seconds=settings.rate_limit_default_period_seconds,
+)
+
+# (metot, yol) -> kural; listede olmayan /api/ istekleri DEFAULT_RULE ile sınırlanır
+RATE_LIMIT_RULES = {
+    ("POST", "/api/auth/login"): AUTH_RULE,
+    ("POST", "/api/auth/register"): AUTH_RULE,
+    ("POST", "/api/auth/refresh"): REFRESH_RULE,
+}
+
+rate_limit_stats = {"allowed": 0, "limited": 0, "backend_errors": 0}
+
+
+def get_rate_limit_stats():
+    return {"backend": settings.rate_limit_backend, **rate_limit_stats}
+
+
+def extract_email(body, content_type):
+    """Giriş (form: username) veya kayıt (JSON: email) gövdesinden email adresini okur"""
+    try:
+        if content_type.startswith("application/x-www-form-urlencoded"):
+            values = parse_qs(body.decode("utf-8")).get("username")
+            email = values[0] if values else None
+        elif content_type.startswith("application/json"):
+            data = json.loads(body)
+            email = data.get("email") if isinstance(data, dict) else None
+        else:
+            return None
+    except ValueError:
+        return None
+    if not isinstance(email, str) or not email:
+        return None
+    return email.strip().lower()
+
+
+class RateLimitMiddleware:
+    """Saf ASGI middleware; sınır aşılırsa isteği uygulamaya iletmeden 429 döndürür"""
+
+    def __init__(self, app, backend=None, rules=None, default_rule=DEFAULT_RULE):
+        self.app = app
+        self.backend = backend or create_rate_limit_backend()
+        self.rules = RATE_LIMIT_RULES if rules is None else rules
+        self.default_rule = default_rule
+
+    def match_rule(self, scope):
+        rule = self.rules.get((scope["method"], scope["path"].rstrip("/")))
+        if rule is None and scope["path"].startswith("/api/"):
+            rule = self.default_rule
+        return rule
+
+    async def acquire(self, key, capacity, refill_per_second):
+        # Paylaşılan depo erişilemezse API'yi durdurmak yerine isteğe izin verilir
+        try:
+            return await self.backend.acquire(key, capacity, refill_per_second)
+        except Exception as e:
+            rate_limit_stats["backend_errors"] += 1
+            print(f"Rate limit arka ucuna erişilemedi: {e}")
+            return 0
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.rate_limit_enabled:
+            await self.app(scope, receive, send)
+            return
+
+        rule = self.match_rule(scope)
+        if rule is None:
+            await self.app(scope, receive, send)
+            return
+
+        client_ip = scope["client"][0] if scope.get("client") else "unknown"
+        retry_after = await self.acquire(f"{rule.name}:ip:{client_ip}", rule.capacity, rule.refill_per_second)
+
+        if not retry_after and rule.email_capacity:
+            body, receive = await self.buffer_body(receive)
+            headers = dict(scope["headers"])
+            email = extract_email(body, headers.get(b"content-type", b"").decode("latin-1")) if body else None
+            if email:
+                retry_after = await self.acquire(
+                    f"{rule.name}:email:{email}", rule.email_capacity, rule.email_refill_per_second
+                )
+
+        if retry_after:
+            rate_limit_stats["limited"] += 1
+            response = JSONResponse(
+                {"detail": "Çok fazla istek gönderildi, lütfen daha sonra tekrar deneyin"},
+                status_code=429,
+                headers={"Retry-After": str(math.ceil(retry_after))},
+            )
+            await response(scope, receive, send)
+            return
+
+        rate_limit_stats["allowed"] += 1
+        await self.app(scope, receive, send)
+
+    async def buffer_body(self, receive):
+        """Gövdeyi okur ve uygulamaya aynen tekrar iletecek bir receive döndürür.
+        Gövde MAX_BUFFERED_BODY_SIZE'ı aşarsa email okunmaz (b"" döner)."""
+        messages = []
+        size = 0
+        while True:
+            message = await receive()
+            messages.append(message)
+            if message["type"] != "http.request":
+                break
+            size += len(message.get("body", b""))
+            if size > MAX_BUFFERED_BODY_SIZE or not message.get("more_body", False):
+                break
+
+        complete = messages[-1]["type"] == "http.request" and not messages[-1].get("more_body", False)
+        body = b"".join(m.get("body", b"") for m in messages) if complete else b""
+
+        async def replay():
+            if messages:
+                return messages.pop(0)
+            return await receive()
+
+        return body, replay
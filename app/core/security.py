@@ -1,9 +1,14 @@
 from datetime import datetime, timedelta
 from typing import Optional
+import hashlib
+import secrets
+import uuid
 from fastapi import HTTPException, Depends, Request
 from jose import jwt, JWTError
-from app.db.database import users_collection, parse_json
-from app.models.user import verify_password
+from app.db.database import user_repository, refresh_token_repository, parse_json
+from app.core.cache import create_cache
+from app.core.config import settings
+from app.core.passwords import verify_password_async
 from fastapi.security import OAuth2PasswordBearer
 from fastapi import APIRouter,status
 
@@ -18,6 +23,61 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/auth/login")
 
 router = APIRouter()
 
+# Email'e göre kullanıcı kayıtları; her kimlik doğrulamalı istekte veritabanına gitmemek için
+user_cache = create_cache("users", settings.user_cache_max_size, settings.user_cache_ttl_seconds)
+
+# Önbelleğe (redis arka ucunda Redis'e) yazılmayan kullanıcı alanları; kimlik "id" ile taşınır
+USER_CACHE_EXCLUDED_FIELDS = ("_id", "password_hash")
+
+# Kullanıcı id'sine göre güncel token_version değerleri; yetkilendirme tam
+# kullanıcı belgesi yerine token içindeki bilgilerle yapılır
+token_version_cache = create_cache(
+    "token_versions", settings.token_version_cache_max_size, settings.token_version_cache_ttl_seconds
+)
+
+async def invalidate_cached_user(*emails, user_id=None):
+    """Kullanıcı değiştiğinde veya silindiğinde tüm worker'lardaki önbellek kayıtlarını siler"""
+    for email in set(emails):
+        if email:
+            await user_cache.invalidate(email)
+    if user_id:
+        await token_version_cache.invalidate(user_id)
+
+def user_token_claims(user: dict):
+    """Access token içine gömülen yetkilendirme bilgileri"""
+    return {
+        "sub": user["email"],
+        "uid": str(user["_id"]),
+        "is_admin": bool(user.get("is_admin", False)),
+        "token_version": user.get("token_version", 0),
+    }
+
+def decode_access_token(token: str):
+    """Token'ı doğrular ve içeriğini döndürür, geçersizse 401 fırlatır"""
+    credentials_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Geçersiz kimlik bilgileri",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    except JWTError:
+        raise credentials_exception
+    if payload.get("sub") is None:
+        raise credentials_exception
+    return payload, credentials_exception
+
+async def get_token_version(user_id: str):
+    """Kullanıcının güncel token_version değerini önbellekten, yoksa veritabanından okur"""
+    version = await token_version_cache.get(user_id)
+    if version is None:
+        # Okuma sürerken token iptal edilirse eski sürüm önbelleğe yazılmaz
+        write_seq = token_version_cache.write_seq
+        version = await user_repository.find_token_version(user_id)
+        if version is not None:
+            await token_version_cache.set(user_id, version, write_seq=write_seq)
+    return version
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
     if expires_delta:
@@ -28,39 +88,96 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
+def hash_refresh_token(refresh_token: str):
+    """Refresh token'lar yüksek entropili rastgele değerlerdir; saklamak için hızlı bir özet yeterlidir"""
+    return hashlib.sha256(refresh_token.encode("utf-8")).hexdigest()
+
+async def issue_refresh_token(user: dict, family_id: Optional[str] = None):
+    """Kullanıcı için yeni bir refresh token üretir ve özetini kaydeder.
+    family_id verilmezse yeni bir giriş oturumu (token ailesi) başlatılır."""
+    refresh_token = secrets.token_urlsafe(32)
+    await refresh_token_repository.insert(
+        hash_refresh_token(refresh_token),
+        user_id=str(user["_id"]),
+        family_id=family_id or uuid.uuid4().hex,
+        token_version=user.get("token_version", 0),
+        expires_at=datetime.utcnow() + timedelta(days=settings.refresh_token_expire_days),
+    )
+    return refresh_token
+
+async def rotate_refresh_token(refresh_token: str):
+    """Refresh token'ı tek kullanımlık olarak tüketir; (kullanıcı, yeni refresh token) döndürür.
+    Daha önce kullanılmış bir token tekrar gelirse token çalınmış kabul edilir ve
+    aynı girişten türeyen tüm refresh token'lar iptal edilir."""
+    invalid_token_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Geçersiz veya süresi dolmuş refresh token",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+    token_hash = hash_refresh_token(refresh_token)
+    record = await refresh_token_repository.consume(token_hash)
+    if record is None:
+        existing = await refresh_token_repository.find(token_hash)
+        if existing is not None and existing.get("used"):
+            await refresh_token_repository.revoke_family(existing["family_id"])
+        raise invalid_token_exception
+
+    # bcrypt gerekmez; kullanıcının güncel yetki bilgileri ve token_version'ı kontrol edilir
+    user = await user_repository.find_by_id(record["user_id"])
+    if user is None or user.get("token_version", 0) != record.get("token_version", 0):
+        await refresh_token_repository.revoke_family(record["family_id"])
+        raise invalid_token_exception
+
+    new_refresh_token = await issue_refresh_token(user, family_id=record["family_id"])
+    return user, new_refresh_token
+
 # Kullanıcı doğrulama fonksiyonu
-def authenticate_user(email: str, password: str):
-    user = users_collection.find_one({"email": email})
+async def authenticate_user(email: str, password: str):
+    user = await user_repository.find_by_email(email)
     if not user:
         return False
-    if not verify_password(password, user["password_hash"]):
+    if not await verify_password_async(password, user["password_hash"]):
         return False
     return user
 
 # Token doğrulama ve mevcut kullanıcıyı alma
 async def get_current_user(token: str = Depends(oauth2_scheme)):
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Geçersiz kimlik bilgileri",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        email: str = payload.get("sub")
-        if email is None:
+    payload, credentials_exception = decode_access_token(token)
+    email: str = payload["sub"]
+    
+    user = await user_cache.get(email)
+    if user is None:
+        write_seq = user_cache.write_seq
+        user = await user_repository.find_by_email(email)
+        if user is None:
             raise credentials_exception
-    except JWTError:
+        user["id"] = str(user["_id"])
+        user = parse_json({key: value for key, value in user.items() if key not in USER_CACHE_EXCLUDED_FIELDS})
+        await user_cache.set(email, user, write_seq=write_seq)
+    
+    # İptal edilmiş (token_version'ı eski) token'ları reddet
+    if "token_version" in payload and payload["token_version"] != user.get("token_version", 0):
         raise credentials_exception
+    return dict(user)
+
+# Veritabanından tam kullanıcı belgesi okumadan, token içeriğiyle yetkilendirme
+async def get_token_claims(token: str = Depends(oauth2_scheme)):
+    payload, credentials_exception = decode_access_token(token)
+    user_id = payload.get("uid")
     
-    user = users_collection.find_one({"email": email})
-    if user is None:
+    # Yetki bilgisi içermeyen eski token'lar için tam kullanıcı kaydına dön
+    if user_id is None:
+        user = await get_current_user(token)
+        return {"id": user["id"], "email": user["email"], "is_admin": bool(user.get("is_admin"))}
+    
+    current_version = await get_token_version(user_id)
+    if current_version is None or current_version != payload.get("token_version", 0):
         raise credentials_exception
     
-    user["id"] = str(user["_id"])
-    return parse_json(user)
+    return {"id": user_id, "email": payload["sub"], "is_admin": bool(payload.get("is_admin"))}
 
 # Yönetici kullanıcı kontrolü
-async def get_current_admin_user(current_user: dict = Depends(get_current_user)):
+async def get_current_admin_user(current_user: dict = Depends(get_token_claims)):
     if not current_user.get("is_admin"):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -69,7 +186,7 @@ async def get_current_admin_user(current_user: dict = Depends(get_current_user))
     return current_user
 
 # İlan işlemleri için yetki kontrolü
-async def check_ilan_permission(request: Request, current_user: dict = Depends(get_current_user)):
+async def check_ilan_permission(request: Request, current_user: dict = Depends(get_token_claims)):
     # Admin kullanıcılar tüm işlemleri yapabilir
     if current_user.get("is_admin"):
         return current_user
@@ -1,153 +1,618 @@
-from pymongo import MongoClient
-from pymongo.errors import ConnectionFailure, DuplicateKeyError
-import sys
-from bson import ObjectId
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError
+from pymongo.monitoring import ConnectionPoolListener
+from motor.motor_asyncio import AsyncIOMotorClient
+import asyncio
+import threading
+from collections.abc import Mapping
+from bson import ObjectId, Decimal128
+from datetime import date, datetime
 import json
+from app.core.config import settings
 
-# MongoDB bağlantı bilgileri
-MONGO_URL = "mongodb://localhost:27017/"
-DB_NAME = "sahiplendirme"
+# Koleksiyon isimleri (bağlantı bilgileri app/core/config.py ayarlarındadır)
 COLLECTION_NAME = "ilanlar"
 COUNTER_COLLECTION_NAME = "counters"
 USER_COLLECTION_NAME = "users"
+REFRESH_TOKEN_COLLECTION_NAME = "refresh_tokens"
+FACET_COLLECTION_NAME = "ilan_facets"
+
+# Veri düzeltmeleri ve indeks uzlaştırması uygulama açılışında değil, dağıtım
+# sırasında bir kez çalıştırılan migration komutuyla yapılır: python -m app.db.migrations
+
+# Her worker'ın sayaçtan tek seferde ayırdığı ilan_no blok büyüklüğü
+ILAN_NO_BLOCK_SIZE = 20
+
+# Eşitlik filtresi olarak kullanılabilen ilan alanları; bunları destekleyen
+# bileşik indeksler app/db/indexes.py kaydında tanımlıdır
+ILAN_FILTER_FIELDS = ("tur", "cins", "cinsiyet", "yas", "bulundugu_yer")
+
+# Sayıları önceden hesaplanan (materialised) facet alanları. ilan_facets
+# koleksiyonunda her (tur, cins, bulundugu_yer) birleşimi için bir sayaç tutulur.
+FACET_FIELDS = ("tur", "cins", "bulundugu_yer")
+
+
+def facet_key(ilan):
+    """İlanın facet sayacının _id'si; alan sırası her yerde aynı olmalıdır"""
+    return {field: ilan.get(field) for field in FACET_FIELDS}
+
+# BSON'a özgü tiplerin JSON karşılıkları
+BSON_CONVERTERS = {
+    ObjectId: str,
+    datetime: datetime.isoformat,
+    date: date.isoformat,
+    Decimal128: lambda value: str(value.to_decimal()),
+}
+
+# Olduğu gibi döndürülen (yaprak) değer tipleri
+JSON_SCALAR_TYPES = frozenset((str, int, float, bool, type(None)))
 
 class JSONEncoder(json.JSONEncoder):
     def default(self, o):
-        if isinstance(o, ObjectId):
-            return str(o)
+        converter = BSON_CONVERTERS.get(type(o))
+        if converter is not None:
+            return converter(o)
         return json.JSONEncoder.default(self, o)
 
 def parse_json(data):
-    """MongoDB sonuçlarını JSON uyumlu formata dönüştürür"""
-    return json.loads(json.dumps(data, cls=JSONEncoder))
-
-try:
-    # MongoDB sunucusuna bağlantı kurma
-    client = MongoClient(MONGO_URL, serverSelectionTimeoutMS=5000)
-    
-    # Bağlantıyı test etme
-    client.admin.command('ping')
-    
-    print("MongoDB bağlantısı başarıyla kuruldu!")
-    print(f"Veritabanı: {DB_NAME}")
-    print(f"Koleksiyonlar: {COLLECTION_NAME}, {USER_COLLECTION_NAME}")
-    
-    # Veritabanı ve koleksiyonu tanımlama
-    db = client[DB_NAME]
-    ilanlar_collection = db[COLLECTION_NAME]
-    counters_collection = db[COUNTER_COLLECTION_NAME]
-    users_collection = db[USER_COLLECTION_NAME]
-    
-    # Mevcut indeksleri kontrol et ve temizle
-    try:
-        ilanlar_collection.drop_index("ilan_no_1")
-        print("Mevcut ilan indeksi temizlendi.")
-    except Exception:
-        print("Mevcut ilan indeksi bulunamadı.")
-    
-    # Mevcut verileri kontrol et ve düzenle
-    # İlan_no değeri olmayan belgeler için ilan_no ekle
-    bulk_ops = []
-    existing_ilan_nos = set()
-    highest_ilan_no = 0
-
-    for ilan in ilanlar_collection.find():
-        if "ilan_no" in ilan:
-            existing_ilan_nos.add(ilan["ilan_no"])
-            highest_ilan_no = max(highest_ilan_no, ilan["ilan_no"])
+    """MongoDB sonuçlarını tek geçişte JSON uyumlu formata dönüştürür"""
+    data_type = type(data)
+    if data_type is dict:
+        return {key: parse_json(value) for key, value in data.items()}
+    if data_type is list or data_type is tuple:
+        return [parse_json(value) for value in data]
+    if data_type in JSON_SCALAR_TYPES:
+        return data
+    # Alt sınıflar ve diğer eşleme tipleri (SON, OrderedDict) hızlı yolun dışında kalır
+    if isinstance(data, Mapping):
+        return {key: parse_json(value) for key, value in data.items()}
+    if isinstance(data, (list, tuple)):
+        return [parse_json(value) for value in data]
+    converter = BSON_CONVERTERS.get(data_type)
+    if converter is not None:
+        return converter(data)
+    return data
+
+class PoolStatsListener(ConnectionPoolListener):
+    """Bağlantı havuzu olaylarını sayarak izleme için istatistik tutar"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.stats = {
+            "connections_created": 0,
+            "connections_closed": 0,
+            "checked_out": 0,
+            "checkouts": 0,
+            "checkout_failures": 0,
+            "pool_clears": 0,
+        }
+
+    def _add(self, key, amount=1):
+        with self._lock:
+            self.stats[key] += amount
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        self._add("pool_clears")
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        self._add("connections_created")
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        self._add("connections_closed")
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_check_out_failed(self, event):
+        self._add("checkout_failures")
+
+    def connection_checked_out(self, event):
+        self._add("checkouts")
+        self._add("checked_out")
+
+    def connection_checked_in(self, event):
+        self._add("checked_out", -1)
+
+
+# Uygulama içinde kullanılan asenkron (Motor) bağlantı. Fork'tan sonra, her
+# worker'da uygulama açılışında (lifespan) bir kez oluşturulur.
+client = None
+pool_stats = PoolStatsListener()
+
+async def connect_to_mongo():
+    """Tek MongoDB istemcisini ayarlanmış havuzla oluşturur ve havuzu ısıtır"""
+    global client
+    client = AsyncIOMotorClient(
+        settings.mongo_url,
+        serverSelectionTimeoutMS=settings.mongo_server_selection_timeout_ms,
+        maxPoolSize=settings.mongo_max_pool_size,
+        minPoolSize=settings.mongo_min_pool_size,
+        maxIdleTimeMS=settings.mongo_max_idle_time_ms,
+        waitQueueTimeoutMS=settings.mongo_wait_queue_timeout_ms,
+        event_listeners=[pool_stats]
+    )
+    # Eşzamanlı ping'ler minPoolSize kadar bağlantıyı ilk istekten önce açar
+    await asyncio.gather(*(
+        client.admin.command('ping') for _ in range(max(settings.mongo_min_pool_size, 1))
+    ))
+
+def close_mongo_connection():
+    """Uygulama kapanırken havuzdaki bağlantıları kapatır"""
+    global client
+    if client is not None:
+        client.close()
+        client = None
+
+def get_database():
+    if client is None:
+        raise RuntimeError("MongoDB istemcisi henüz oluşturulmadı (connect_to_mongo çağrılmalı)")
+    return client[settings.db_name]
+
+def get_collection(name):
+    return get_database()[name]
+
+def get_pool_stats():
+    """Bağlantı havuzu ayarlarını ve anlık sayaçlarını döndürür"""
+    return {
+        "max_pool_size": settings.mongo_max_pool_size,
+        "min_pool_size": settings.mongo_min_pool_size,
+        "max_idle_time_ms": settings.mongo_max_idle_time_ms,
+        "wait_queue_timeout_ms": settings.mongo_wait_queue_timeout_ms,
+        **pool_stats.stats,
+    }
+
+def bson_now():
+    """Şu anki UTC zamanı BSON'un sakladığı milisaniye hassasiyetinde döndürür.
+    Yazılan belgeden kurulan yanıt, aynı belgenin veritabanından okunmuş haliyle
+    bayt bayt aynı olur (ETag'ler version'a bağlıdır)."""
+    now = datetime.utcnow()
+    return now.replace(microsecond=now.microsecond // 1000 * 1000)
+
+
+class SequenceBlockAllocator:
+    """Sayaçtan tek bir atomik $inc ile blok halinde değer ayırıp bellekten dağıtır (hi/lo)
+
+    Her süreç kendi bloğunu ayırdığı için birden fazla worker ve yeniden
+    başlatmalar arasında aynı değer iki kez verilmez; kullanılmadan kalan
+    değerler yalnızca numaralarda boşluk bırakır.
+    """
+
+    def __init__(self, sequence_name, block_size, seed_collection_name, seed_field):
+        self.sequence_name = sequence_name
+        self.block_size = block_size
+        self.seed_collection_name = seed_collection_name
+        self.seed_field = seed_field
+        self._next_value = 1
+        self._last_value = 0
+        self._seeded = False
+        self._lock = asyncio.Lock()
+
+    async def _seed(self):
+        """Sayacı koleksiyondaki en yüksek değerin gerisinde kalmayacak şekilde hazırlar"""
+        highest_doc = await get_collection(self.seed_collection_name).find_one(
+            {self.seed_field: {"$exists": True}},
+            sort=[(self.seed_field, -1)],
+            projection={self.seed_field: 1}
+        )
+        highest_value = highest_doc[self.seed_field] if highest_doc else 0
+        # $max yarışsızdır ve tekrar çalıştırılabilir; sayacı asla geri almaz
+        await get_collection(COUNTER_COLLECTION_NAME).update_one(
+            {"_id": self.sequence_name},
+            {"$max": {"seq": highest_value}},
+            upsert=True
+        )
+        self._seeded = True
+
+    async def reserve(self, count):
+        """count adet ardışık değeri tek bir $inc ile ayırır, (ilk, son) döndürür"""
+        if not self._seeded:
+            await self._seed()
+        sequence_document = await get_collection(COUNTER_COLLECTION_NAME).find_one_and_update(
+            {"_id": self.sequence_name},
+            {"$inc": {"seq": count}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        last_value = sequence_document["seq"]
+        return last_value - count + 1, last_value
+
+    async def next(self):
+        """Bellekteki bloktan bir sonraki değeri verir, blok bittiyse yenisini ayırır"""
+        async with self._lock:
+            if self._next_value > self._last_value:
+                self._next_value, self._last_value = await self.reserve(self.block_size)
+            value = self._next_value
+            self._next_value += 1
+            return value
+
+
+class SingleFlight:
+    """Aynı anahtarla eşzamanlı gelen okumaları tek bir MongoDB çağrısında birleştirir
+
+    İlk çağrı sorguyu başlatır; sonuç gelene kadar aynı anahtarla gelenler bu
+    sorgunun sonucunu bekler. Sonuç tüm bekleyenlerle paylaşıldığı için
+    çağıranlar dönen belgeleri değiştirmemelidir.
+    """
+
+    def __init__(self):
+        self._in_flight = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    def _finished(self, key, task):
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        # Bekleyenlerin hepsi iptal edildiyse hatanın "okunmadı" uyarısı vermemesi için
+        if not task.cancelled():
+            task.exception()
+
+    async def do(self, key, func, *args):
+        task = self._in_flight.get(key)
+        if task is None:
+            self.calls += 1
+            task = asyncio.ensure_future(func(*args))
+            self._in_flight[key] = task
+            task.add_done_callback(lambda finished: self._finished(key, finished))
         else:
-            # ilan_no olmayan belgelere geçici ilan_no ata (ileride güncellenecek)
-            ilanlar_collection.update_one({"_id": ilan["_id"]}, {"$set": {"ilan_no": -1}})
-
-    # Tekrarlanan ilan_no'ları çöz
-    duplicates = ilanlar_collection.aggregate([
-        {"$group": {"_id": "$ilan_no", "count": {"$sum": 1}}},
-        {"$match": {"count": {"$gt": 1}}}
-    ])
-    
-    for dup in duplicates:
-        # Tekrarlanan ilan_no'ya sahip belgeleri bul
-        duplicate_ilans = list(ilanlar_collection.find({"ilan_no": dup["_id"]}))
-        
-        # İlk belgeyi atla, diğerlerine yeni ilan_no değerleri ata
-        for i in range(1, len(duplicate_ilans)):
-            highest_ilan_no += 1
-            ilanlar_collection.update_one(
-                {"_id": duplicate_ilans[i]["_id"]}, 
-                {"$set": {"ilan_no": highest_ilan_no}}
-            )
-    
-    # Sayaç koleksiyonunu oluştur veya güncelle
-    if not counters_collection.find_one({"_id": "ilan_id"}):
-        counters_collection.insert_one({"_id": "ilan_id", "seq": highest_ilan_no})
-    else:
-        counters_collection.update_one(
-            {"_id": "ilan_id"}, 
-            {"$set": {"seq": highest_ilan_no}}
+            self.coalesced += 1
+        # İsteklerden biri iptal edilse de sorgu diğerleri için sürer
+        return await asyncio.shield(task)
+
+    def forget(self):
+        """Yazmadan sonra gelen okumaların, yazmadan önce başlamış sorgulara
+        katılmaması için devam eden çağrıları unutur (bekleyenler sonucu yine alır)"""
+        self._in_flight.clear()
+
+    def stats(self):
+        total = self.calls + self.coalesced
+        return {
+            "calls": self.calls,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._in_flight),
+            "coalesced_ratio": self.coalesced / total if total else 0.0,
+        }
+
+
+def query_key(document):
+    """Sorgu ve projeksiyon sözlüklerini single-flight anahtarında kullanılabilir hale getirir"""
+    if not document:
+        return None
+    return tuple(sorted((field, query_key(value) if isinstance(value, dict) else value)
+                        for field, value in document.items()))
+
+
+class IlanRepository:
+    """İlan koleksiyonu için asenkron veri erişim katmanı
+
+    Her ilan bir version sayacı ve updated_at zamanı taşır. Koleksiyondaki her
+    ekleme, güncelleme ve silme ayrıca counters koleksiyonundaki değişiklik
+    sayacını artırır; liste yanıtlarının ETag'i bu sayaçtan üretilir.
+    """
+
+    def __init__(self, collection_name, change_counter_id, facet_collection_name):
+        self.collection_name = collection_name
+        self.change_counter_id = change_counter_id
+        self.facet_collection_name = facet_collection_name
+        # Aynı ilan, sayfa veya filtre için eşzamanlı okumalar tek sorgu paylaşır
+        self.single_flight = SingleFlight()
+
+    @property
+    def collection(self):
+        return get_collection(self.collection_name)
+
+    async def find_page(self, limit, after_ilan_no=None, filters=None, projection=None):
+        """ilan_no üzerinde keyset sayfalama yapar, sonraki sayfa imlecini de döndürür.
+        Yalnızca ilan_no istenirse sorgu bileşik indekslerden karşılanır (covered query)."""
+        key = ("find_page", limit, after_ilan_no, query_key(filters), query_key(projection))
+        return await self.single_flight.do(key, self._find_page, limit, after_ilan_no, filters, projection)
+
+    async def _find_page(self, limit, after_ilan_no, filters, projection):
+        query = dict(filters or {})
+        if after_ilan_no is not None:
+            query["ilan_no"] = {"$gt": after_ilan_no}
+        # Sıralama unique ilan_no indeksinden okunur, skip kullanılmaz.
+        # Bir fazla belge çekerek sonraki sayfanın olup olmadığını anlarız.
+        cursor = self.collection.find(query, projection).sort("ilan_no", 1).limit(limit + 1)
+        ilanlar = await cursor.to_list(length=limit + 1)
+        next_after_ilan_no = None
+        if len(ilanlar) > limit:
+            ilanlar = ilanlar[:limit]
+            next_after_ilan_no = ilanlar[-1]["ilan_no"]
+        return ilanlar, next_after_ilan_no
+
+    async def search_page(self, text, limit, after_score=None, after_ilan_no=None, filters=None, projection=None):
+        """Metin araması yapar; sonuçlar textScore'a göre azalan, eşitlikte ilan_no'ya göre sıralanır"""
+        key = ("search_page", text, limit, after_score, after_ilan_no, query_key(filters), query_key(projection))
+        return await self.single_flight.do(
+            key, self._search_page, text, limit, after_score, after_ilan_no, filters, projection
         )
-    
-    # İlanlar için unique indeksi oluştur
-    print("Yeni ilan unique indeksi oluşturuluyor...")
-    ilanlar_collection.create_index("ilan_no", unique=True)
-    print("İlan unique indeksi başarıyla oluşturuldu.")
-    
-    # Kullanıcılar için email unique indeksi oluştur
-    print("Kullanıcılar için email unique indeksi oluşturuluyor...")
-    users_collection.create_index("email", unique=True)
-    print("Kullanıcı email indeksi başarıyla oluşturuldu.")
-    
-except ConnectionFailure as e:
-    print(f"MongoDB bağlantısı kurulamadı: {e}", file=sys.stderr)
-    sys.exit(1)
-except DuplicateKeyError as e:
-    print(f"Duplicate key hatası: {e}", file=sys.stderr)
-    print("Mevcut değerlerde çakışma var, veritabanı temizlenmeli.", file=sys.stderr)
-    sys.exit(1)
-except Exception as e:
-    print(f"Beklenmeyen bir hata oluştu: {e}", file=sys.stderr)
-    sys.exit(1)
-
-def get_next_sequence_value(sequence_name):
-    """Belirtilen sıra için bir sonraki değeri alır ve günceller"""
-    # Önce sayaç belgesinin var olup olmadığını kontrol et
-    counter = counters_collection.find_one({"_id": sequence_name})
-    
-    if counter is None:
-        # Sayaç belgesi yoksa oluştur
-        print(f"Sayaç belgesi '{sequence_name}' bulunamadı, yeni oluşturuluyor...")
-        # Mevcut en yüksek ilan_no'yu bul
-        highest_ilan_no = 0
-        if ilanlar_collection.count_documents({}) > 0:
-            highest_doc = ilanlar_collection.find_one(
-                {}, 
-                sort=[("ilan_no", -1)]
-            )
-            if highest_doc and "ilan_no" in highest_doc:
-                highest_ilan_no = highest_doc["ilan_no"]
-        
-        # Yeni sayaç belgesi oluştur
-        counters_collection.insert_one({"_id": sequence_name, "seq": highest_ilan_no})
-        
-    # Sayaç değerini arttır ve yeni değeri al
-    sequence_document = counters_collection.find_one_and_update(
-        {"_id": sequence_name},
-        {"$inc": {"seq": 1}},
-        return_document=True
-    )
-    
-    # Hala None ise, ciddi bir sorun var
-    if sequence_document is None:
-        print(f"HATA: Sayaç belgesi '{sequence_name}' güncellenemedi!", file=sys.stderr)
-        # Acil durum çözümü: Rastgele büyük bir sayı döndür
-        import time
-        return int(time.time())
-    
-    return sequence_document["seq"]
-
-def check_connection():
+
+    async def _search_page(self, text, limit, after_score, after_ilan_no, filters, projection):
+        pipeline = [
+            {"$match": {"$text": {"$search": text}, **(filters or {})}},
+            {"$addFields": {"score": {"$meta": "textScore"}}},
+        ]
+        # (score, ilan_no) çifti üzerinde keyset: önceki sayfanın son kaydından sonrası
+        if after_score is not None and after_ilan_no is not None:
+            pipeline.append({"$match": {"$or": [
+                {"score": {"$lt": after_score}},
+                {"score": after_score, "ilan_no": {"$gt": after_ilan_no}},
+            ]}})
+        pipeline += [
+            {"$sort": {"score": -1, "ilan_no": 1}},
+            {"$limit": limit + 1},
+        ]
+        if projection is not None:
+            pipeline.append({"$project": {**projection, "score": 1}})
+        ilanlar = await self.collection.aggregate(pipeline).to_list(length=limit + 1)
+        next_cursor = None
+        if len(ilanlar) > limit:
+            ilanlar = ilanlar[:limit]
+            next_cursor = (ilanlar[-1]["score"], ilanlar[-1]["ilan_no"])
+        return ilanlar, next_cursor
+
+    async def iter_all(self, projection=None, after_ilan_no=None, filters=None, batch_size=500):
+        """Tüm ilanları listeye toplamadan, imleç üzerinden partiler halinde gezer"""
+        query = dict(filters or {})
+        if after_ilan_no is not None:
+            query["ilan_no"] = {"$gt": after_ilan_no}
+        cursor = self.collection.find(query, projection).sort("ilan_no", 1).batch_size(batch_size)
+        async for ilan in cursor:
+            yield ilan
+
+    async def find_by_no(self, ilan_no):
+        return await self.single_flight.do(("find_by_no", ilan_no), self.collection.find_one, {"ilan_no": ilan_no})
+
+    async def find_by_nos(self, ilan_nos, projection=None):
+        """Verilen numaralardaki ilanları tek sorguda getirir (sırası garanti edilmez)"""
+        ilan_nos = tuple(ilan_nos)
+        key = ("find_by_nos", ilan_nos, query_key(projection))
+        return await self.single_flight.do(key, self._find_by_nos, ilan_nos, projection)
+
+    async def _find_by_nos(self, ilan_nos, projection):
+        return await self.collection.find({"ilan_no": {"$in": list(ilan_nos)}}, projection).to_list(length=None)
+
+    async def get_change_count(self):
+        """Koleksiyonun değişiklik sayacını döndürür; hiç değişiklik yoksa 0"""
+        counter = await get_collection(COUNTER_COLLECTION_NAME).find_one({"_id": self.change_counter_id})
+        return counter["seq"] if counter else 0
+
+    async def _record_change(self):
+        self.single_flight.forget()
+        # Sayaç belge yazıldıktan sonra artırılır; aradaki okumalar yeni veriyi
+        # eski sayaçla görebilir, bu yalnızca bir sonraki istekte tam yanıt demektir
+        await get_collection(COUNTER_COLLECTION_NAME).update_one(
+            {"_id": self.change_counter_id},
+            {"$inc": {"seq": 1}},
+            upsert=True
+        )
+
+    async def _update_facets(self, changes):
+        """(ilan, +1/-1) çiftlerine göre facet sayaçlarını $inc ile günceller.
+        İlan yazmasıyla aynı işlemde olmadığından oluşabilecek sapmalar
+        python -m app.db.facets komutuyla düzeltilir."""
+        totals = {}
+        for ilan, delta in changes:
+            key = tuple(ilan.get(field) for field in FACET_FIELDS)
+            totals[key] = totals.get(key, 0) + delta
+        operations = [
+            UpdateOne({"_id": dict(zip(FACET_FIELDS, key))}, {"$inc": {"count": delta}}, upsert=True)
+            for key, delta in totals.items() if delta
+        ]
+        if operations:
+            await get_collection(self.facet_collection_name).bulk_write(operations, ordered=False)
+
+    async def get_facets(self, filters=None):
+        """tur, cins ve bulundugu_yer için ilan sayılarını döndürür. Yalnızca sayaç
+        belgeleri okunur; maliyet ilan sayısına değil birleşim sayısına bağlıdır."""
+        query = {f"_id.{field}": value for field, value in (filters or {}).items()}
+        query["count"] = {"$gt": 0}
+        buckets = await get_collection(self.facet_collection_name).find(query).to_list(length=None)
+        facets = {field: {} for field in FACET_FIELDS}
+        total = 0
+        for bucket in buckets:
+            total += bucket["count"]
+            for field in FACET_FIELDS:
+                value = bucket["_id"].get(field)
+                if value is not None:
+                    facets[field][value] = facets[field].get(value, 0) + bucket["count"]
+        return {"total": total, **facets}
+
+    async def insert(self, ilan_data):
+        # insert_one belgeye _id ekler; yanıt tekrar okumadan bu belgeden kurulur
+        ilan_data["version"] = 1
+        ilan_data["updated_at"] = bson_now()
+        await self.collection.insert_one(ilan_data)
+        await self._update_facets([(ilan_data, 1)])
+        await self._record_change()
+        return ilan_data
+
+    async def insert_many(self, ilanlar):
+        """Sırasız toplu ekleme yapar; başarısız belgeler için {sıra: hata} döndürür"""
+        now = bson_now()
+        for ilan_data in ilanlar:
+            ilan_data["version"] = 1
+            ilan_data["updated_at"] = now
+        failures = {}
+        try:
+            await self.collection.insert_many(ilanlar, ordered=False)
+        except BulkWriteError as e:
+            failures = {error["index"]: error["errmsg"] for error in e.details.get("writeErrors", [])}
+        if len(failures) < len(ilanlar):
+            await self._update_facets([
+                (ilan_data, 1) for index, ilan_data in enumerate(ilanlar) if index not in failures
+            ])
+            await self._record_change()
+        return failures
+
+    async def update(self, ilan_no, ilan_data):
+        """İlanı günceller ve güncel halini döndürür, ilan yoksa None"""
+        updated_at = bson_now()
+        # Önceki belge facet sayaçlarını karşılaştırmak için gerekir; güncel hali
+        # $set ile yazılan alanlardan tekrar okumadan kurulur
+        previous_ilan = await self.collection.find_one_and_update(
+            {"ilan_no": ilan_no},
+            {"$set": {**ilan_data, "updated_at": updated_at}, "$inc": {"version": 1}},
+            return_document=ReturnDocument.BEFORE
+        )
+        if previous_ilan is None:
+            return None
+        updated_ilan = {
+            **previous_ilan,
+            **ilan_data,
+            "updated_at": updated_at,
+            "version": previous_ilan.get("version", 0) + 1,
+        }
+        if facet_key(previous_ilan) != facet_key(updated_ilan):
+            await self._update_facets([(previous_ilan, -1), (updated_ilan, 1)])
+        await self._record_change()
+        return updated_ilan
+
+    async def delete(self, ilan_no):
+        deleted_ilan = await self.collection.find_one_and_delete(
+            {"ilan_no": ilan_no},
+            projection={field: 1 for field in FACET_FIELDS}
+        )
+        if deleted_ilan is None:
+            return False
+        await self._update_facets([(deleted_ilan, -1)])
+        await self._record_change()
+        return True
+
+
+class UserRepository:
+    """Kullanıcı koleksiyonu için asenkron veri erişim katmanı"""
+
+    def __init__(self, collection_name):
+        self.collection_name = collection_name
+
+    @property
+    def collection(self):
+        return get_collection(self.collection_name)
+
+    async def find_all(self):
+        return await self.collection.find().to_list(length=None)
+
+    async def find_by_id(self, user_id):
+        return await self.collection.find_one({"_id": ObjectId(user_id)})
+
+    async def find_by_email(self, email):
+        return await self.collection.find_one({"email": email})
+
+    async def insert(self, user_data):
+        # Email benzersizliği unique indeksle sağlanır (DuplicateKeyError)
+        await self.collection.insert_one(user_data)
+        return user_data
+
+    async def find_token_version(self, user_id):
+        """Kullanıcının güncel token_version değerini döndürür, kullanıcı yoksa None"""
+        user = await self.collection.find_one({"_id": ObjectId(user_id)}, projection={"token_version": 1})
+        if user is None:
+            return None
+        return user.get("token_version", 0)
+
+    async def update(self, user_id, user_data, revoke_tokens=False):
+        """Kullanıcıyı günceller; (önceki, güncel) belge çiftini, kullanıcı yoksa (None, None) döndürür.
+        revoke_tokens verilirse token_version artırılır ve eski token'lar geçersiz olur."""
+        update = {"$set": user_data}
+        if revoke_tokens:
+            update["$inc"] = {"token_version": 1}
+        # Önceki belge eski email'in önbellekten silinebilmesi için gerekir;
+        # güncel hali $set ile yazılan alanlardan tekrar okumadan kurulur
+        previous_user = await self.collection.find_one_and_update(
+            {"_id": ObjectId(user_id)},
+            update,
+            return_document=ReturnDocument.BEFORE
+        )
+        if previous_user is None:
+            return None, None
+        updated_user = {**previous_user, **user_data}
+        if revoke_tokens:
+            updated_user["token_version"] = previous_user.get("token_version", 0) + 1
+        return previous_user, updated_user
+
+    async def revoke_tokens(self, user_id):
+        """token_version'ı artırarak kullanıcının tüm token'larını geçersiz kılar, kullanıcı yoksa None"""
+        return await self.collection.find_one_and_update(
+            {"_id": ObjectId(user_id)},
+            {"$inc": {"token_version": 1}},
+            return_document=ReturnDocument.AFTER
+        )
+
+    async def delete(self, user_id):
+        """Kullanıcıyı siler ve silinen belgeyi döndürür, kullanıcı yoksa None"""
+        return await self.collection.find_one_and_delete({"_id": ObjectId(user_id)})
+
+
+class RefreshTokenRepository:
+    """Refresh token kayıtları için asenkron veri erişim katmanı
+
+    Token'ın kendisi değil sha256 özeti _id olarak saklanır. Kullanılmış kayıtlar
+    süreleri dolana kadar (TTL indeksi) tekrar kullanım tespiti için tutulur.
+    """
+
+    def __init__(self, collection_name):
+        self.collection_name = collection_name
+
+    @property
+    def collection(self):
+        return get_collection(self.collection_name)
+
+    async def insert(self, token_hash, user_id, family_id, token_version, expires_at):
+        await self.collection.insert_one({
+            "_id": token_hash,
+            "user_id": user_id,
+            "family_id": family_id,
+            "token_version": token_version,
+            "used": False,
+            "created_at": datetime.utcnow(),
+            "expires_at": expires_at,
+        })
+
+    async def consume(self, token_hash):
+        """Kullanılmamış ve süresi dolmamış token'ı tek adımda kullanılmış olarak işaretler;
+        kaydı döndürür, token geçersizse None"""
+        now = datetime.utcnow()
+        return await self.collection.find_one_and_update(
+            {"_id": token_hash, "used": False, "expires_at": {"$gt": now}},
+            {"$set": {"used": True, "used_at": now}},
+            return_document=ReturnDocument.BEFORE
+        )
+
+    async def find(self, token_hash):
+        return await self.collection.find_one({"_id": token_hash})
+
+    async def revoke_family(self, family_id):
+        """Aynı girişten türeyen tüm refresh token'ları siler"""
+        result = await self.collection.delete_many({"family_id": family_id})
+        return result.deleted_count
+
+
+ilan_repository = IlanRepository(
+    COLLECTION_NAME, change_counter_id="ilanlar_changes", facet_collection_name=FACET_COLLECTION_NAME
+)
+ilan_no_allocator = SequenceBlockAllocator(
+    "ilan_id", ILAN_NO_BLOCK_SIZE, seed_collection_name=COLLECTION_NAME, seed_field="ilan_no"
+)
+user_repository = UserRepository(USER_COLLECTION_NAME)
+refresh_token_repository = RefreshTokenRepository(REFRESH_TOKEN_COLLECTION_NAME)
+
+async def check_connection():
     """MongoDB bağlantısını yeniden kontrol eden fonksiyon"""
     try:
-        client.admin.command('ping')
+        await client.admin.command('ping')
         return True, "MongoDB bağlantısı aktif"
     except Exception as e:
         return False, f"MongoDB bağlantısı hatalı: {e}"
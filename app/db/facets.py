@@ -0,0 +1,48 @@
+"""İlan facet sayaçlarını (ilan_facets) baştan hesaplayan komut
+
+Sayaçlar normalde her yazmada $inc ile güncellenir. Bir hata veya elle yapılan
+bir veri düzeltmesi sonucu sapma oluşursa bu komutla yeniden kurulur:
+
+    python -m app.db.facets
+
+Sayım tek bir aggregation ile yapılır ve $out ile ilan_facets koleksiyonunun
+yerine atomik olarak yazılır. Komut çalışırken yapılan yazmaların sayaç
+artışları kaybolabileceği için düşük trafikli bir zamanda çalıştırılmalıdır.
+"""
+import sys
+
+from pymongo import MongoClient
+from pymongo.errors import ConnectionFailure
+
+from app.core.config import settings
+from app.db.database import COLLECTION_NAME, FACET_COLLECTION_NAME, FACET_FIELDS
+
+
+def rebuild_ilan_facets(db):
+    """ilan_facets koleksiyonunu ilanlardan yeniden hesaplar"""
+    db[COLLECTION_NAME].aggregate([
+        # _id alan sırası facet_key ile aynı olmalıdır; eksik alanlar null sayılır
+        {"$group": {
+            "_id": {field: {"$ifNull": [f"${field}", None]} for field in FACET_FIELDS},
+            "count": {"$sum": 1},
+        }},
+        {"$out": FACET_COLLECTION_NAME},
+    ], allowDiskUse=True)
+    buckets = db[FACET_COLLECTION_NAME].count_documents({})
+    print(f"{buckets} facet sayacı yeniden hesaplandı.")
+
+
+def main():
+    client = MongoClient(settings.mongo_url, serverSelectionTimeoutMS=settings.mongo_server_selection_timeout_ms)
+    try:
+        client.admin.command('ping')
+        rebuild_ilan_facets(client[settings.db_name])
+    except ConnectionFailure as e:
+        print(f"MongoDB bağlantısı kurulamadı: {e}", file=sys.stderr)
+        sys.exit(1)
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+"""Koleksiyon indekslerinin bildirimsel kaydı ve uzlaştırma (reconcile) komutu
+
+Kayıttaki indeksler veritabanındakilerle karşılaştırılır; eksik olanlar
+oluşturulur, tanımı değişenler yeniden oluşturulur, kayıtta olmayanlar
+kaldırılır. Zaten doğru olan indekslere dokunulmaz.
+
+    python -m app.db.indexes             # değişiklikleri uygula
+    python -m app.db.indexes --dry-run   # yalnızca planı göster
+"""
+import argparse
+import sys
+
+from pymongo import MongoClient
+from pymongo.errors import ConnectionFailure
+
+from app.core.config import settings
+from app.db.database import (
+    COLLECTION_NAME,
+    COUNTER_COLLECTION_NAME,
+    FACET_COLLECTION_NAME,
+    REFRESH_TOKEN_COLLECTION_NAME,
+    USER_COLLECTION_NAME,
+)
+
+# Karşılaştırılan indeks seçenekleri ve varsayılan değerleri
+COMPARED_OPTIONS = {
+    "unique": False,
+    "sparse": False,
+    "expireAfterSeconds": None,
+    "partialFilterExpression": None,
+}
+
+
+def index(keys, name=None, **options):
+    """Kayıt için bir indeks tanımı oluşturur; isim verilmezse MongoDB'nin varsayılanı kullanılır"""
+    if name is None:
+        name = "_".join(f"{field}_{direction}" for field, direction in keys)
+    return {"name": name, "keys": list(keys), "options": options}
+
+
+# Eşitlik alanları önce, sıralama alanı (ilan_no) en sonda yer alır; böylece
+# filtreli sayfalar IXSCAN ile okunur ve sıralama indeksten gelir.
+# Liste uç noktası yalnızca bu indekslerden birinin ilan_no'dan önceki alanlarıyla
+# birebir örtüşen filtre birleşimlerini kabul eder (ILAN_FILTER_COMBINATIONS);
+# arayüzde sık kullanılan birleşimlerin her biri için bir indeks bulunur.
+ILAN_INDEXES = [
+    index([("ilan_no", 1)], unique=True),
+    index([("tur", 1), ("ilan_no", 1)]),
+    index([("tur", 1), ("cins", 1), ("ilan_no", 1)]),
+    index([("tur", 1), ("cinsiyet", 1), ("ilan_no", 1)]),
+    index([("tur", 1), ("yas", 1), ("ilan_no", 1)]),
+    index([("tur", 1), ("cinsiyet", 1), ("yas", 1), ("ilan_no", 1)]),
+    index([("cins", 1), ("ilan_no", 1)]),
+    index([("cinsiyet", 1), ("ilan_no", 1)]),
+    index([("yas", 1), ("ilan_no", 1)]),
+    index([("cinsiyet", 1), ("yas", 1), ("ilan_no", 1)]),
+    index([("bulundugu_yer", 1), ("ilan_no", 1)]),
+    index([("bulundugu_yer", 1), ("cins", 1), ("ilan_no", 1)]),
+    index([("bulundugu_yer", 1), ("tur", 1), ("ilan_no", 1)]),
+    index([("bulundugu_yer", 1), ("tur", 1), ("cins", 1), ("ilan_no", 1)]),
+    # Hikaye ve karakter özelliklerinde Türkçe tam metin araması
+    index(
+        [("hikaye", "text"), ("karakter_ozellikleri", "text"), ("cins", "text")],
+        name="ilan_text",
+        default_language="turkish",
+        weights={"cins": 10, "karakter_ozellikleri": 5, "hikaye": 2},
+    ),
+]
+
+USER_INDEXES = [
+    index([("email", 1)], unique=True),
+]
+
+# Süresi dolan refresh token'lar TTL indeksiyle MongoDB tarafından silinir
+REFRESH_TOKEN_INDEXES = [
+    index([("expires_at", 1)], expireAfterSeconds=0),
+    index([("family_id", 1)]),
+]
+
+
+
+def sorted_filter_combinations(specs, sort_field="ilan_no"):
+    """Eşitlik filtresi + sort_field sıralamasının tamamen indeksten karşılanabildiği
+    filtre alanı kümelerini döndürür (sort_field'dan önceki indeks alanları)"""
+    combinations = set()
+    for spec in specs:
+        fields = [field for field, direction in spec["keys"]]
+        if sort_field in fields and all(direction in (1, -1) for _, direction in spec["keys"]):
+            combinations.add(frozenset(fields[:fields.index(sort_field)]))
+    return frozenset(combinations)
+
+
+# Filtreli listelemede kabul edilen alan birleşimleri
+ILAN_FILTER_COMBINATIONS = sorted_filter_combinations(ILAN_INDEXES)
+
+INDEX_REGISTRY = {
+    COLLECTION_NAME: ILAN_INDEXES,
+    USER_COLLECTION_NAME: USER_INDEXES,
+    REFRESH_TOKEN_COLLECTION_NAME: REFRESH_TOKEN_INDEXES,
+    COUNTER_COLLECTION_NAME: [],
+    # Facet sayaçları yalnızca _id ile güncellenir ve küçük olduğu için tamamen okunur
+    FACET_COLLECTION_NAME: [],
+}
+
+
+def index_matches(existing, spec):
+    """Veritabanındaki indeks tanımının kayıttaki tanımla aynı olup olmadığını kontrol eder"""
+    text_fields = {field: 1 for field, direction in spec["keys"] if direction == "text"}
+    if text_fields:
+        # Text indeksler listelenirken _fts/_ftsx anahtarlarıyla görünür
+        expected_keys = [(field, direction) for field, direction in spec["keys"] if direction != "text"]
+        existing_keys = [(field, direction) for field, direction in existing["key"].items()
+                         if field not in ("_fts", "_ftsx") and direction != "text"]
+        if existing_keys != expected_keys:
+            return False
+        if existing.get("weights", {}) != spec["options"].get("weights", text_fields):
+            return False
+        if existing.get("default_language", "english") != spec["options"].get("default_language", "english"):
+            return False
+    elif list(existing["key"].items()) != spec["keys"]:
+        return False
+
+    for option, default in COMPARED_OPTIONS.items():
+        if existing.get(option, default) != spec["options"].get(option, default):
+            return False
+    return True
+
+
+def plan_index_changes(collection, specs):
+    """Oluşturulacak indeks tanımlarını ve kaldırılacak indeks isimlerini döndürür"""
+    existing = {item["name"]: item for item in collection.list_indexes()}
+    to_create = []
+    to_drop = []
+
+    for spec in specs:
+        current = existing.get(spec["name"])
+        if current is None:
+            to_create.append(spec)
+        elif not index_matches(current, spec):
+            to_drop.append(spec["name"])
+            to_create.append(spec)
+
+    desired_names = {spec["name"] for spec in specs}
+    for name in existing:
+        if name != "_id_" and name not in desired_names:
+            to_drop.append(name)
+
+    return to_create, to_drop
+
+
+def reconcile_indexes(db, dry_run=False):
+    """Kayıttaki indeksleri veritabanına uygular; dry_run ise yalnızca planı yazdırır"""
+    changed = False
+    for collection_name, specs in INDEX_REGISTRY.items():
+        collection = db[collection_name]
+        to_create, to_drop = plan_index_changes(collection, specs)
+
+        for name in to_drop:
+            changed = True
+            print(f"[{collection_name}] kaldırılacak: {name}")
+            if not dry_run:
+                collection.drop_index(name)
+
+        for spec in to_create:
+            changed = True
+            print(f"[{collection_name}] oluşturulacak: {spec['name']} {spec['keys']}")
+            if not dry_run:
+                collection.create_index(spec["keys"], name=spec["name"], **spec["options"])
+
+    if not changed:
+        print("İndeksler güncel, değişiklik yok.")
+    return changed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Koleksiyon indekslerini kayıtla uzlaştırır")
+    parser.add_argument("--dry-run", action="store_true", help="değişiklik yapmadan planı göster")
+    args = parser.parse_args()
+
+    client = MongoClient(settings.mongo_url, serverSelectionTimeoutMS=settings.mongo_server_selection_timeout_ms)
+    try:
+        client.admin.command('ping')
+        reconcile_indexes(client[settings.db_name], dry_run=args.dry_run)
+    except ConnectionFailure as e:
+        print(f"MongoDB bağlantısı kurulamadı: {e}", file=sys.stderr)
+        sys.exit(1)
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+"""Sürümlü veritabanı migration komutu
+
+Dağıtım sırasında bir kez çalıştırılır:
+
+    python -m app.db.migrations
+
+Uygulanan en son sürüm "migrations" koleksiyonunda tutulur; komut tekrar
+çalıştırıldığında yalnızca henüz uygulanmamış migration'lar çalışır.
+Migration'lardan sonra indeksler app/db/indexes.py kaydıyla uzlaştırılır.
+
+Aynı anda tek bir çalıştırma olması migrations.lock belgesiyle sağlanır. Kilit
+sahibini ve bitiş zamanını tutar, her migration'dan sonra uzatılır; süresi
+dolmuş bir kilit (ör. öldürülen bir çalıştırmadan kalan) bir sonraki
+çalıştırmada devralınır.
+"""
+import os
+import socket
+import sys
+import uuid
+from datetime import datetime, timedelta
+
+from pymongo import MongoClient, ReturnDocument, UpdateOne
+from pymongo.errors import ConnectionFailure, DuplicateKeyError
+
+from app.core.config import settings
+from app.db.database import (
+    COLLECTION_NAME,
+    COUNTER_COLLECTION_NAME,
+)
+from app.db.facets import rebuild_ilan_facets
+from app.db.indexes import reconcile_indexes
+
+MIGRATIONS_COLLECTION_NAME = "migrations"
+SCHEMA_VERSION_ID = "schema_version"
+MIGRATION_LOCK_ID = "lock"
+
+
+def backfill_ilan_no(db):
+    """ilan_no değeri olmayan veya tekrarlanan ilanlara yeni numara verir,
+    sayacı günceller ve ilan_no unique indeksini oluşturur"""
+    ilanlar_collection = db[COLLECTION_NAME]
+    counters_collection = db[COUNTER_COLLECTION_NAME]
+
+    # Eski sürümlerde unique olmayan bir ilan_no indeksi kalmış olabilir
+    indexes = ilanlar_collection.index_information()
+    if "ilan_no_1" in indexes and not indexes["ilan_no_1"].get("unique"):
+        ilanlar_collection.drop_index("ilan_no_1")
+        print("Unique olmayan ilan_no indeksi kaldırıldı.")
+
+    highest_doc = ilanlar_collection.find_one(
+        {"ilan_no": {"$gte": 1}},
+        sort=[("ilan_no", -1)],
+        projection={"ilan_no": 1}
+    )
+    highest_ilan_no = highest_doc["ilan_no"] if highest_doc else 0
+
+    # ilan_no'su olmayan ya da eski başlangıç kodunun bıraktığı geçici (-1) değerli ilanlar
+    bulk_ops = []
+    missing = ilanlar_collection.find(
+        {"$or": [{"ilan_no": {"$exists": False}}, {"ilan_no": None}, {"ilan_no": {"$lt": 1}}]},
+        projection={"_id": 1}
+    )
+    for ilan in missing:
+        highest_ilan_no += 1
+        bulk_ops.append(UpdateOne({"_id": ilan["_id"]}, {"$set": {"ilan_no": highest_ilan_no}}))
+
+    # Tekrarlanan ilan_no'larda ilk belge numarasını korur, diğerleri yeni numara alır
+    duplicates = ilanlar_collection.aggregate([
+        {"$match": {"ilan_no": {"$gte": 1}}},
+        {"$group": {"_id": "$ilan_no", "ids": {"$push": "$_id"}, "count": {"$sum": 1}}},
+        {"$match": {"count": {"$gt": 1}}}
+    ], allowDiskUse=True)
+    for dup in duplicates:
+        for duplicate_id in dup["ids"][1:]:
+            highest_ilan_no += 1
+            bulk_ops.append(UpdateOne({"_id": duplicate_id}, {"$set": {"ilan_no": highest_ilan_no}}))
+
+    if bulk_ops:
+        ilanlar_collection.bulk_write(bulk_ops, ordered=False)
+        print(f"{len(bulk_ops)} ilana yeni ilan_no verildi.")
+
+    # Sayaç mevcut en yüksek değerin gerisinde kalmamalı
+    counters_collection.update_one(
+        {"_id": "ilan_id"},
+        {"$max": {"seq": highest_ilan_no}},
+        upsert=True
+    )
+
+    ilanlar_collection.create_index("ilan_no", unique=True)
+    print("İlan unique indeksi hazır.")
+
+
+# (sürüm, açıklama, fonksiyon) — yeni migration'lar listenin sonuna eklenir,
+# uygulanmış bir migration sonradan değiştirilmez
+MIGRATIONS = [
+    (1, "ilan_no değerlerini tamamla, tekrarları düzelt ve unique indeksi oluştur", backfill_ilan_no),
+    (2, "ilan facet sayaçlarını oluştur", rebuild_ilan_facets),
+]
+
+
+def get_schema_version(db):
+    """Uygulanmış en son migration sürümünü döndürür"""
+    document = db[MIGRATIONS_COLLECTION_NAME].find_one({"_id": SCHEMA_VERSION_ID})
+    return document["version"] if document else 0
+
+
+async def check_schema_version(db):
+    """Uygulama açılışında migration'ların çalıştırıldığını tek bir belge okumasıyla
+    doğrular (db Motor veritabanıdır); şema geride ise RuntimeError fırlatır"""
+    document = await db[MIGRATIONS_COLLECTION_NAME].find_one({"_id": SCHEMA_VERSION_ID})
+    version = document["version"] if document else 0
+    latest_version = MIGRATIONS[-1][0]
+    if version < latest_version:
+        raise RuntimeError(
+            f"Veritabanı şema sürümü {version}, uygulama {latest_version} bekliyor; "
+            "başlatmadan önce 'python -m app.db.migrations' çalıştırılmalı"
+        )
+
+
+def lock_expiry(now):
+    return now + timedelta(seconds=settings.migration_lock_ttl_seconds)
+
+
+def acquire_migration_lock(migrations_collection, owner):
+    """Migration kilidini alır; kilit başkasındaysa ve süresi dolmadıysa RuntimeError fırlatır"""
+    now = datetime.utcnow()
+    lock = {"owner": owner, "locked_at": now, "expires_at": lock_expiry(now)}
+    try:
+        migrations_collection.insert_one({"_id": MIGRATION_LOCK_ID, **lock})
+        return
+    except DuplicateKeyError:
+        pass
+
+    # Süresi dolmuş kilidi atomik olarak devral; expires_at'i olmayan eski
+    # kilitler locked_at'e göre değerlendirilir
+    stale_lock = migrations_collection.find_one_and_update(
+        {"_id": MIGRATION_LOCK_ID, "$or": [
+            {"expires_at": {"$lt": now}},
+            {"expires_at": {"$exists": False}, "locked_at": {"$lt": now - timedelta(seconds=settings.migration_lock_ttl_seconds)}},
+        ]},
+        {"$set": lock},
+        return_document=ReturnDocument.BEFORE
+    )
+    if stale_lock is None:
+        current_lock = migrations_collection.find_one({"_id": MIGRATION_LOCK_ID}) or {}
+        raise RuntimeError(
+            f"Başka bir migration çalışıyor (sahibi: {current_lock.get('owner', 'bilinmiyor')}, "
+            f"kilit bitişi: {current_lock.get('expires_at', 'bilinmiyor')})"
+        )
+    print(f"Süresi dolmuş migration kilidi devralındı (önceki sahibi: {stale_lock.get('owner', 'bilinmiyor')})")
+
+
+def renew_migration_lock(migrations_collection, owner):
+    """Kilidin süresini uzatır; kilit bu arada devralındıysa RuntimeError fırlatır"""
+    result = migrations_collection.update_one(
+        {"_id": MIGRATION_LOCK_ID, "owner": owner},
+        {"$set": {"expires_at": lock_expiry(datetime.utcnow())}}
+    )
+    if result.matched_count == 0:
+        raise RuntimeError("Migration kilidi başka bir çalıştırma tarafından devralındı")
+
+
+def release_migration_lock(migrations_collection, owner):
+    """Kilidi yalnızca hâlâ bu çalıştırmaya aitse siler"""
+    migrations_collection.delete_one({"_id": MIGRATION_LOCK_ID, "owner": owner})
+
+
+def run_migrations(db):
+    """Henüz uygulanmamış migration'ları sırayla çalıştırır ve sürümü kaydeder"""
+    migrations_collection = db[MIGRATIONS_COLLECTION_NAME]
+
+    # Aynı anda iki dağıtımın migration çalıştırmasını engelle
+    owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+    acquire_migration_lock(migrations_collection, owner)
+
+    try:
+        current_version = get_schema_version(db)
+        print(f"Mevcut şema sürümü: {current_version}")
+
+        for version, description, migrate in MIGRATIONS:
+            if version <= current_version:
+                continue
+            print(f"Migration {version} uygulanıyor: {description}")
+            migrate(db)
+            renew_migration_lock(migrations_collection, owner)
+            migrations_collection.update_one(
+                {"_id": SCHEMA_VERSION_ID},
+                {
+                    "$set": {"version": version},
+                    "$push": {"applied": {
+                        "version": version,
+                        "description": description,
+                        "applied_at": datetime.utcnow()
+                    }}
+                },
+                upsert=True
+            )
+            current_version = version
+
+        print(f"Şema sürümü güncel: {current_version}")
+    finally:
+        release_migration_lock(migrations_collection, owner)
+
+
+def main():
+    client = MongoClient(settings.mongo_url, serverSelectionTimeoutMS=settings.mongo_server_selection_timeout_ms)
+    try:
+        client.admin.command('ping')
+        db = client[settings.db_name]
+        run_migrations(db)
+        reconcile_indexes(db)
+    except ConnectionFailure as e:
+        print(f"MongoDB bağlantısı kurulamadı: {e}", file=sys.stderr)
+        sys.exit(1)
+    except Exception as e:
+        print(f"Migration başarısız oldu: {e}", file=sys.stderr)
+        sys.exit(1)
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    main()
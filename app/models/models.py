@@ -1,5 +1,6 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import Optional, List, Dict
+from datetime import datetime
 
 class Ilan(BaseModel):
     ilan_no: int
@@ -24,6 +25,18 @@ class IlanCreate(BaseModel):
     iletisim: str
     hikaye: str
 
+class IlanUpdate(BaseModel):
+    """Kısmi güncelleme (PATCH) modeli - yalnızca gönderilen alanlar güncellenir"""
+    tur: Optional[str] = None
+    cins: Optional[str] = None
+    yas: Optional[str] = None
+    cinsiyet: Optional[str] = None
+    saglik_durumu: Optional[str] = None
+    karakter_ozellikleri: Optional[str] = None
+    bulundugu_yer: Optional[str] = None
+    iletisim: Optional[str] = None
+    hikaye: Optional[str] = None
+
 class IlanResponse(BaseModel):
     ilan_no: int
     tur: str
@@ -35,6 +48,29 @@ class IlanResponse(BaseModel):
     bulundugu_yer: str
     iletisim: str
     hikaye: str
+    version: Optional[int] = None
+    updated_at: Optional[datetime] = None
     
     class Config:
-        orm_mode = True
\ No newline at end of file
+        orm_mode = True
+
+class IlanPage(BaseModel):
+    items: List[IlanResponse]
+    next_after_ilan_no: Optional[int] = None
+    next_after_score: Optional[float] = None
+
+class IlanBulkItemResult(BaseModel):
+    index: int
+    ilan_no: Optional[int] = None
+    error: Optional[str] = None
+
+class IlanBulkResponse(BaseModel):
+    inserted: int
+    failed: int
+    results: List[IlanBulkItemResult]
+
+class IlanFacets(BaseModel):
+    total: int
+    tur: Dict[str, int]
+    cins: Dict[str, int]
+    bulundugu_yer: Dict[str, int]
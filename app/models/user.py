@@ -14,6 +14,16 @@ class UserCreate(UserBase):
     """Kullanıcı oluşturma modeli - şifre içerir"""
     password: str
 
+class UserUpdate(BaseModel):
+    """Kısmi güncelleme (PATCH) modeli - yalnızca gönderilen alanlar güncellenir,
+    şifre yalnızca gönderildiğinde yeniden hashlenir"""
+    first_name: Optional[str] = None
+    last_name: Optional[str] = None
+    email: Optional[EmailStr] = None
+    phone: Optional[str] = None
+    is_admin: Optional[bool] = None
+    password: Optional[str] = None
+
 class UserInDB(UserBase):
     """Veritabanında saklanan kullanıcı modeli"""
     password_hash: str
@@ -25,6 +35,10 @@ class UserResponse(UserBase):
     class Config:
         from_attributes = True
 
+class RefreshTokenRequest(BaseModel):
+    """Access token yenileme isteği"""
+    refresh_token: str
+
 # MongoDB için kullanıcı belge şeması
 user_schema = {
     "first_name": {"type": "string", "required": True},
@@ -0,0 +1,76 @@
+"""Üretim ortamı başlatıcısı
+
+    python -m app.server
+
+Birden fazla worker süreci başlatır (varsayılan: CPU sayısı). Worker'lar
+ayrı süreçler olarak başlar ve her biri MongoDB istemcisini kendi açılışında
+(lifespan) oluşturur; fork öncesinde paylaşılan bir istemci yoktur.
+Belirlenen istek sayısına (± rastgele bir pay) ulaşan worker kapanır ve yerine
+yenisi başlatılır. uvloop ve httptools kuruluysa kullanılır.
+
+Worker başına bellekte tutulan önbellekler ancak redis geçersiz kılma kanalıyla
+tutarlı kalır. Kanal "local" iken birden fazla worker istenirse başlatıcı
+çalışmaz; worker sayısı verilmemişse tek worker başlatılır. Rate limit arka ucu
+"memory" iken sınırlar worker sayısı kadar gevşeyeceği için uyarı verilir.
+"""
+import importlib.util
+import os
+import sys
+
+import uvicorn
+
+from app.core.config import settings
+
+
+def is_installed(module_name):
+    return importlib.util.find_spec(module_name) is not None
+
+
+def resolve_workers():
+    """Başlatılacak worker sayısını döndürür; ayarlar birden fazla worker ile
+    tutarsızsa ValueError fırlatır"""
+    workers = settings.server_workers or os.cpu_count() or 1
+    if workers > 1 and settings.cache_invalidation_bus == "local":
+        if settings.server_workers:
+            raise ValueError(
+                f"SERVER_WORKERS={workers} iken CACHE_INVALIDATION_BUS=local kullanılamaz: bir worker'daki "
+                "yazma ve token iptalleri diğer worker'ların önbelleklerine ulaşmaz. "
+                "CACHE_INVALIDATION_BUS=redis ayarlayın veya SERVER_WORKERS=1 kullanın."
+            )
+        print(
+            "UYARI: CACHE_INVALIDATION_BUS=local olduğu için tek worker başlatılıyor. "
+            "Birden fazla worker için CACHE_INVALIDATION_BUS=redis ayarlayın.",
+            file=sys.stderr,
+        )
+        workers = 1
+    if workers > 1 and settings.rate_limit_backend == "memory":
+        print(
+            f"UYARI: RATE_LIMIT_BACKEND=memory ile {workers} worker çalışıyor; her worker kendi kovasını "
+            f"tuttuğu için istek sınırları fiilen {workers} katına çıkar. RATE_LIMIT_BACKEND=redis önerilir.",
+            file=sys.stderr,
+        )
+    return workers
+
+
+def main():
+    try:
+        workers = resolve_workers()
+    except ValueError as e:
+        print(f"Sunucu başlatılamadı: {e}", file=sys.stderr)
+        sys.exit(1)
+    uvicorn.run(
+        "main:app",
+        host=settings.server_host,
+        port=settings.server_port,
+        workers=workers,
+        loop="uvloop" if is_installed("uvloop") else "asyncio",
+        http="httptools" if is_installed("httptools") else "h11",
+        limit_max_requests=settings.server_max_requests or None,
+        # Worker'lar aynı anda başladığı için aynı anda yenilenmemeleri adına sınıra rastgele pay eklenir
+        limit_max_requests_jitter=settings.server_max_requests_jitter,
+        proxy_headers=True,
+    )
+
+
+if __name__ == "__main__":
+    main()
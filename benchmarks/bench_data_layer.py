@@ -0,0 +1,82 @@
+"""Senkron pymongo ile Motor (asenkron) veri katmanının eşzamanlı istek verimi
+
+    python -m benchmarks.bench_data_layer [--duration 10] [--concurrency 1 10 50 100]
+
+Aynı sayfa sorgusu iki uç noktadan ölçülür:
+
+- sync: async def içinde senkron pymongo çağrısı (önceki veri katmanı). Her
+  sorgu event loop'u bloklar; istekler worker içinde sırayla işlenir.
+- async: uygulamanın Motor üzerindeki IlanRepository.find_page metodu.
+
+Eşzamanlılık arttıkça async satırının verimi artmalı, sync satırınınki sabit
+kalmalıdır. MongoDB ağ üzerinden ne kadar uzaktaysa fark o kadar büyür.
+"""
+import argparse
+import asyncio
+import random
+from contextlib import asynccontextmanager
+
+# benchmarks.common ortam ayarlarını app içe aktarılmadan önce yapar
+from benchmarks.common import app_client, print_table, reset_database, run_load, sync_database
+
+from fastapi import FastAPI
+
+from app.db.database import COLLECTION_NAME, close_mongo_connection, connect_to_mongo, ilan_repository, parse_json
+
+PAGE_SIZE = 50
+
+
+def build_app():
+    sync_client, sync_db = sync_database()
+    sync_collection = sync_db[COLLECTION_NAME]
+
+    @asynccontextmanager
+    async def lifespan(app):
+        await connect_to_mongo()
+        yield
+        close_mongo_connection()
+        sync_client.close()
+
+    app = FastAPI(lifespan=lifespan)
+
+    @app.get("/sync/ilanlar")
+    async def sync_page(after_ilan_no: int):
+        cursor = sync_collection.find({"ilan_no": {"$gt": after_ilan_no}}).sort("ilan_no", 1).limit(PAGE_SIZE)
+        return parse_json(list(cursor))
+
+    @app.get("/async/ilanlar")
+    async def async_page(after_ilan_no: int):
+        ilanlar, _ = await ilan_repository.find_page(PAGE_SIZE, after_ilan_no)
+        return parse_json(ilanlar)
+
+    return app
+
+
+async def main(args):
+    reset_database(args.ilanlar)
+    app = build_app()
+
+    rows = []
+    async with app_client(app) as client:
+        for concurrency in args.concurrency:
+            for variant in ("sync", "async"):
+                async def read_page():
+                    after_ilan_no = random.randint(0, max(args.ilanlar - PAGE_SIZE, 0))
+                    response = await client.get(f"/{variant}/ilanlar", params={"after_ilan_no": after_ilan_no})
+                    return response.status_code == 200
+
+                rows.append((f"{variant} x{concurrency}", await run_load(read_page, concurrency, args.duration)))
+
+    print_table(f"Sayfa sorgusu verimi ({args.ilanlar} ilan, sayfa başına {PAGE_SIZE})", rows)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--duration", type=float, default=10, help="senaryo başına süre (saniye)")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 10, 50, 100], help="eşzamanlı istemci sayıları")
+    parser.add_argument("--ilanlar", type=int, default=10000, help="veritabanındaki ilan sayısı")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
@@ -0,0 +1,93 @@
+"""Hazır JSON deposundan sunulan ilan listesi ile önceki get_ilanlar karşılaştırması
+
+    python -m benchmarks.bench_ilan_store [--sizes 1000 10000 100000] [--duration 10]
+
+Her ilan sayısı için veritabanı baştan kurulur ve iki uç nokta aynı rastgele
+sayfalarla yüklenir:
+
+- önceki: tam belgeleri okur, parse_json + IlanResponse doğrulaması yapar ve
+  IlanPage yanıt modeliyle yeniden serileştirir (depodan önceki get_ilanlar).
+- depo: uygulamanın /ilanlar/ uç noktası; MongoDB'den yalnızca ilan_no okur,
+  gövdeyi depodaki hazır baytları birleştirerek kurar.
+
+Ölçümden önce tüm sayfalar bir kez okunarak depo ısıtılır (ILAN_CACHE_MAX_SIZE
+ilan sayısından küçükse depo ilanların yalnızca bir kısmını tutar).
+"""
+import argparse
+import asyncio
+import random
+from typing import Optional
+
+# benchmarks.common ortam ayarlarını app içe aktarılmadan önce yapar
+from benchmarks.common import access_token, app_client, print_table, reset_database, run_load, seed_users
+
+from fastapi import Depends, Query
+
+from app.core.security import check_ilan_permission
+from app.db.database import ilan_repository, parse_json
+from app.models.models import IlanPage, IlanResponse
+
+PAGE_SIZE = 50
+
+
+async def legacy_get_ilanlar(
+    limit: int = Query(PAGE_SIZE, ge=1, le=200),
+    after_ilan_no: Optional[int] = Query(None),
+    current_user: dict = Depends(check_ilan_permission),
+):
+    """Depodan önceki liste uç noktası: istek başına BSON -> dict -> model -> JSON"""
+    query = {"ilan_no": {"$gt": after_ilan_no}} if after_ilan_no is not None else {}
+    ilanlar = await ilan_repository.collection.find(query).sort("ilan_no", 1).limit(limit + 1).to_list(length=limit + 1)
+    next_after_ilan_no = None
+    if len(ilanlar) > limit:
+        ilanlar = ilanlar[:limit]
+        next_after_ilan_no = ilanlar[-1]["ilan_no"]
+    items = [IlanResponse.model_validate(parse_json(ilan)) for ilan in ilanlar]
+    return IlanPage(items=items, next_after_ilan_no=next_after_ilan_no)
+
+
+async def measure(app, token, ilan_count, duration, concurrency):
+    rows = []
+    headers = {"Authorization": f"Bearer {token}"}
+    async with app_client(app) as client:
+        # Isınma: tüm sayfaları sırayla okuyarak depoyu doldur
+        after_ilan_no = 0
+        while after_ilan_no is not None:
+            response = await client.get(f"/api/routes/ilanlar/?limit=200&after_ilan_no={after_ilan_no}", headers=headers)
+            after_ilan_no = response.json()["next_after_ilan_no"]
+
+        for label, path in (("önceki", "/bench/legacy-ilanlar/"), ("depo", "/api/routes/ilanlar/")):
+            async def read_page():
+                after_ilan_no = random.randint(0, max(ilan_count - PAGE_SIZE, 0))
+                response = await client.get(path, params={"limit": PAGE_SIZE, "after_ilan_no": after_ilan_no}, headers=headers)
+                return response.status_code == 200
+
+            rows.append((f"{label} ({ilan_count} ilan)", await run_load(read_page, concurrency, duration)))
+    return rows
+
+
+async def main(args):
+    from main import app
+
+    app.add_api_route("/bench/legacy-ilanlar/", legacy_get_ilanlar, methods=["GET"], response_model=IlanPage)
+
+    rows = []
+    for size in args.sizes:
+        print(f"{size} ilan yazılıyor...")
+        reset_database(size)
+        token = access_token(seed_users(["bench-store@example.com"])[0])
+        rows += await measure(app, token, size, args.duration, args.concurrency)
+
+    print_table(f"Liste sayfası verimi ({args.concurrency} eşzamanlı istemci, sayfa başına {PAGE_SIZE})", rows)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000], help="ilan sayıları")
+    parser.add_argument("--duration", type=float, default=10, help="senaryo başına süre (saniye)")
+    parser.add_argument("--concurrency", type=int, default=50, help="eşzamanlı istemci sayısı")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
@@ -0,0 +1,87 @@
+"""Liste okumaları sürerken giriş (bcrypt) verimi
+
+    python -m benchmarks.bench_login [--duration 10] [--readers 50] [--logins 8]
+
+Üç senaryo ölçülür: yalnızca liste okumaları, yalnızca girişler ve ikisi
+birlikte. Şifre doğrulama thread havuzunda çalıştığı için eşzamanlı girişler
+liste okumalarının gecikmesini belirgin şekilde artırmamalıdır.
+--inline-hashing ile bcrypt eskisi gibi event loop üzerinde çalıştırılır;
+iki çalıştırmanın tabloları karşılaştırılabilir.
+
+Kapasite aşıldığında dönen 503'ler "errors" sütununda sayılır
+(PASSWORD_HASH_WORKERS ve PASSWORD_HASH_MAX_PENDING ile ayarlanır).
+"""
+import argparse
+import asyncio
+import random
+
+# benchmarks.common ortam ayarlarını app içe aktarılmadan önce yapar
+from benchmarks.common import access_token, app_client, print_table, reset_database, run_load, seed_users
+
+from app.core import security
+from app.core.passwords import get_password_stats
+from app.models.user import verify_password
+
+PASSWORD = "benchmark-sifre"
+
+
+async def verify_password_inline(plain_password, hashed_password):
+    """Önceki davranış: bcrypt doğrudan event loop üzerinde çalışır"""
+    return verify_password(plain_password, hashed_password)
+
+
+async def main(args):
+    reset_database(args.ilanlar)
+    users = seed_users([f"bench{index}@example.com" for index in range(args.users)], PASSWORD)
+    token = access_token(users[0])
+    if args.inline_hashing:
+        security.verify_password_async = verify_password_inline
+
+    from main import app
+
+    async with app_client(app) as client:
+        headers = {"Authorization": f"Bearer {token}"}
+
+        async def read_page():
+            after_ilan_no = random.randint(0, max(args.ilanlar - 50, 0))
+            response = await client.get(f"/api/routes/ilanlar/?limit=50&after_ilan_no={after_ilan_no}", headers=headers)
+            return response.status_code == 200
+
+        async def login():
+            user = random.choice(users)
+            response = await client.post("/api/auth/login", data={"username": user["email"], "password": PASSWORD})
+            return response.status_code == 200
+
+        # Isınma: ilan deposu ve önbellekler dolsun
+        await run_load(read_page, args.readers, 2)
+
+        reads_only = await run_load(read_page, args.readers, args.duration)
+        logins_only = await run_load(login, args.logins, args.duration)
+        mixed_reads, mixed_logins = await asyncio.gather(
+            run_load(read_page, args.readers, args.duration),
+            run_load(login, args.logins, args.duration),
+        )
+
+    mode = "event loop üzerinde bcrypt" if args.inline_hashing else "thread havuzunda bcrypt"
+    print_table(f"Giriş verimi ({mode}, {args.readers} okuyucu, {args.logins} giriş istemcisi)", [
+        ("liste (yalnız)", reads_only),
+        ("giriş (yalnız)", logins_only),
+        ("liste (girişlerle)", mixed_reads),
+        ("giriş (okumalarla)", mixed_logins),
+    ])
+    print(f"\nŞifre işlemleri: {get_password_stats()}")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--duration", type=float, default=10, help="senaryo başına süre (saniye)")
+    parser.add_argument("--readers", type=int, default=50, help="eşzamanlı liste okuyucu sayısı")
+    parser.add_argument("--logins", type=int, default=8, help="eşzamanlı giriş istemcisi sayısı")
+    parser.add_argument("--users", type=int, default=20, help="giriş yapan farklı kullanıcı sayısı")
+    parser.add_argument("--ilanlar", type=int, default=10000, help="veritabanındaki ilan sayısı")
+    parser.add_argument("--inline-hashing", action="store_true", help="bcrypt'i event loop üzerinde çalıştır (önceki davranış)")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
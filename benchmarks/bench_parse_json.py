@@ -0,0 +1,69 @@
+"""parse_json mikro benchmark'ı: tek geçişli dönüştürücü ile json dumps/loads gidiş-dönüşü
+
+    python -m benchmarks.bench_parse_json [--repeat 5]
+
+MongoDB gerekmez. Belgeler ObjectId, datetime ve Decimal128 alanları içeren
+ilanlardır; 1, 100 ve 10.000 belgelik listeler için çağrı başına en iyi süre
+raporlanır. Eski yöntem de aynı JSONEncoder'ı kullanır; yani yalnızca
+serileştirme geçişlerinin maliyeti karşılaştırılır.
+"""
+import argparse
+import json
+import random
+import timeit
+from datetime import datetime, timedelta
+
+from bson import Decimal128, ObjectId
+
+# benchmarks.common ortam ayarlarını app içe aktarılmadan önce yapar
+from benchmarks.common import make_ilan
+
+from app.db.database import JSONEncoder, parse_json
+
+SIZES = [1, 100, 10000]
+
+
+def parse_json_roundtrip(data):
+    """Önceki yöntem: iki tam serileştirme geçişi"""
+    return json.loads(json.dumps(data, cls=JSONEncoder))
+
+
+def make_documents(count, seed=42):
+    rng = random.Random(seed)
+    created_at = datetime(2024, 1, 1)
+    documents = []
+    for ilan_no in range(1, count + 1):
+        ilan = make_ilan(ilan_no, rng)
+        ilan["_id"] = ObjectId()
+        ilan["updated_at"] = created_at + timedelta(minutes=ilan_no)
+        ilan["sahiplendirme_ucreti"] = Decimal128(f"{rng.randint(0, 500)}.50")
+        ilan["asilar"] = [{"ad": "Kuduz", "tarih": created_at}, {"ad": "Karma", "tarih": created_at}]
+        documents.append(ilan)
+    return documents
+
+
+def best_time(func, data, repeat):
+    """Çağrı başına en iyi süreyi (saniye) döndürür"""
+    number = max(1, 10000 // len(data))
+    return min(timeit.repeat(lambda: func(data), number=number, repeat=repeat)) / number
+
+
+def main(args):
+    print(f"{'belge':>8}  {'dumps/loads (ms)':>18}  {'parse_json (ms)':>16}  {'hızlanma':>9}")
+    for size in args.sizes:
+        documents = make_documents(size)
+        assert parse_json(documents) == parse_json_roundtrip(documents)
+        roundtrip = best_time(parse_json_roundtrip, documents, args.repeat)
+        single_pass = best_time(parse_json, documents, args.repeat)
+        print(f"{size:>8}  {roundtrip * 1000:>18.3f}  {single_pass * 1000:>16.3f}  {roundtrip / single_pass:>8.1f}x")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5, help="ölçüm tekrar sayısı")
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES, help="liste başına belge sayıları")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    main(parse_args())
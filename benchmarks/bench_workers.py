@@ -0,0 +1,142 @@
+"""Worker sayısına göre yük benchmark'ı (varsayılan 1/2/4/8 worker)
+
+    python -m benchmarks.bench_workers --cache-redis-url redis://localhost:6379/0
+
+Her worker sayısı için python -m app.server ayrı bir süreç olarak başlatılır ve
+ağ üzerinden liste sayfası istekleriyle yüklenir. Yük üreten istemciler tek
+bir Python sürecinin darboğaz olmaması için birden fazla süreçte çalışır
+(--client-processes); makinede sunucu ve istemciler için yeterli CPU olmalıdır.
+
+Birden fazla worker için redis geçersiz kılma kanalı gerekir (bkz. app/server.py);
+--cache-redis-url verilmezse yalnızca 1 worker ölçülür. Rate limit kapalıdır.
+"""
+import argparse
+import asyncio
+import os
+import random
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+import httpx
+
+# benchmarks.common ortam ayarlarını app içe aktarılmadan önce yapar
+from benchmarks.common import access_token, collect_load, print_table, reset_database, seed_users, summarize
+
+from app.core.config import settings
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PAGE_SIZE = 50
+
+
+def server_environment(args, workers):
+    env = dict(
+        os.environ,
+        SERVER_WORKERS=str(workers),
+        SERVER_PORT=str(args.port),
+        SERVER_HOST="127.0.0.1",
+        DB_NAME=settings.db_name,
+        RATE_LIMIT_ENABLED="false",
+    )
+    if args.cache_redis_url:
+        env.update(CACHE_INVALIDATION_BUS="redis", CACHE_REDIS_URL=args.cache_redis_url)
+    return env
+
+
+def wait_until_ready(base_url, process, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Sunucu başlatılamadı (çıkış kodu {process.returncode})")
+        try:
+            if httpx.get(f"{base_url}/", timeout=1).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError("Sunucu zamanında hazır olmadı")
+
+
+def client_process(base_url, token, concurrency, duration, ilan_count):
+    """Ayrı bir süreçte yük üretir; (gecikmeler, hata sayısı, süre) döndürür"""
+    async def run():
+        limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+        headers = {"Authorization": f"Bearer {token}"}
+        async with httpx.AsyncClient(base_url=base_url, headers=headers, limits=limits, timeout=30) as client:
+            async def read_page():
+                after_ilan_no = random.randint(0, max(ilan_count - PAGE_SIZE, 0))
+                response = await client.get(f"/api/routes/ilanlar/?limit={PAGE_SIZE}&after_ilan_no={after_ilan_no}")
+                return response.status_code == 200
+
+            return await collect_load(read_page, concurrency, duration)
+
+    return asyncio.run(run())
+
+
+def run_clients(executor, args, base_url, token, duration):
+    futures = [
+        executor.submit(client_process, base_url, token, args.concurrency, duration, args.ilanlar)
+        for _ in range(args.client_processes)
+    ]
+    latencies, errors, elapsed = [], 0, 0.0
+    for future in futures:
+        process_latencies, process_errors, process_elapsed = future.result()
+        latencies += process_latencies
+        errors += process_errors
+        elapsed = max(elapsed, process_elapsed)
+    return summarize(latencies, errors, elapsed)
+
+
+def main(args):
+    worker_counts = args.workers
+    if not args.cache_redis_url and any(workers > 1 for workers in worker_counts):
+        print("--cache-redis-url verilmediği için yalnızca 1 worker ölçülecek", file=sys.stderr)
+        worker_counts = [1]
+
+    reset_database(args.ilanlar)
+    user = seed_users(["bench-workers@example.com"])[0]
+    token = access_token(user)
+    base_url = f"http://127.0.0.1:{args.port}"
+
+    rows = []
+    with ProcessPoolExecutor(args.client_processes, mp_context=get_context("spawn")) as executor:
+        for workers in worker_counts:
+            process = subprocess.Popen(
+                [sys.executable, "-m", "app.server"],
+                cwd=REPO_ROOT,
+                env=server_environment(args, workers),
+                stdout=None if args.verbose else subprocess.DEVNULL,
+                stderr=None if args.verbose else subprocess.DEVNULL,
+            )
+            try:
+                wait_until_ready(base_url, process)
+                # Isınma: her worker'ın ilan deposu ve önbellekleri dolsun
+                run_clients(executor, args, base_url, token, 2)
+                rows.append((f"{workers} worker", run_clients(executor, args, base_url, token, args.duration)))
+            finally:
+                process.terminate()
+                process.wait(timeout=30)
+
+    print_table(
+        f"Liste sayfası verimi ({args.client_processes} istemci süreci x {args.concurrency} bağlantı)",
+        rows,
+    )
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8], help="ölçülecek worker sayıları")
+    parser.add_argument("--duration", type=float, default=15, help="worker sayısı başına süre (saniye)")
+    parser.add_argument("--concurrency", type=int, default=32, help="istemci süreci başına eşzamanlı bağlantı")
+    parser.add_argument("--client-processes", type=int, default=4, help="yük üreten süreç sayısı")
+    parser.add_argument("--ilanlar", type=int, default=10000, help="veritabanındaki ilan sayısı")
+    parser.add_argument("--port", type=int, default=8765, help="benchmark sunucusunun portu")
+    parser.add_argument("--cache-redis-url", help="birden fazla worker için redis geçersiz kılma kanalı adresi")
+    parser.add_argument("--verbose", action="store_true", help="sunucu çıktısını göster")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    main(parse_args())
@@ -0,0 +1,176 @@
+"""Benchmark betiklerinin ortak yardımcıları
+
+Betikler depo kökünden modül olarak çalıştırılır:
+
+    python -m benchmarks.bench_login
+
+Gerçek bir MongoDB gerekir (MONGO_URL). Veriler ayrı bir veritabanına
+(varsayılan: sahiplendirme_bench) yazılır ve her çalıştırmada baştan kurulur.
+İstek sınırlama, ölçümü bozmaması için kapatılır. Ayarlar ortam değişkenlerinden
+okunduğu için bu modül app paketinden önce içe aktarılmalıdır.
+"""
+import os
+
+os.environ.setdefault("DB_NAME", "sahiplendirme_bench")
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+
+import asyncio
+import random
+import time
+from contextlib import asynccontextmanager
+
+import httpx
+from pymongo import MongoClient
+
+from app.core.config import settings
+from app.core.security import create_access_token, user_token_claims
+from app.db.database import COLLECTION_NAME, COUNTER_COLLECTION_NAME, USER_COLLECTION_NAME
+from app.db.facets import rebuild_ilan_facets
+from app.db.indexes import reconcile_indexes
+from app.models.user import get_password_hash
+
+# Veritabanı doldurulurken tek insert_many ile yazılan ilan sayısı
+SEED_BATCH_SIZE = 5000
+
+TURLER = ["Kedi", "Köpek", "Kuş", "Tavşan"]
+CINSLER = ["Tekir", "Van", "Golden", "Kangal", "Muhabbet", "Hollanda"]
+YASLAR = ["Yavru", "Genç", "Yetişkin", "Yaşlı"]
+CINSIYETLER = ["Dişi", "Erkek"]
+SEHIRLER = ["İstanbul", "Ankara", "İzmir", "Bursa", "Antalya"]
+
+
+def make_ilan(ilan_no, rng):
+    return {
+        "ilan_no": ilan_no,
+        "tur": rng.choice(TURLER),
+        "cins": rng.choice(CINSLER),
+        "yas": rng.choice(YASLAR),
+        "cinsiyet": rng.choice(CINSIYETLER),
+        "saglik_durumu": "Aşıları tam, kısırlaştırılmış",
+        "karakter_ozellikleri": "Oyuncu, insan canlısı, diğer hayvanlarla iyi anlaşır",
+        "bulundugu_yer": rng.choice(SEHIRLER),
+        "iletisim": f"0555 000 {ilan_no % 100:02d} {ilan_no % 97:02d}",
+        "hikaye": "Sokakta bulundu, tedavisi yapıldı ve yeni yuvasını bekliyor. " * 3,
+        "version": 1,
+    }
+
+
+def sync_database():
+    """Benchmark veritabanına senkron bir bağlantı döndürür (client, db)"""
+    client = MongoClient(settings.mongo_url, serverSelectionTimeoutMS=settings.mongo_server_selection_timeout_ms)
+    return client, client[settings.db_name]
+
+
+def reset_database(ilan_count=0, seed=42):
+    """Benchmark veritabanını siler, indeksleri kurar ve ilan_count ilan yazar"""
+    client, db = sync_database()
+    try:
+        client.drop_database(settings.db_name)
+        reconcile_indexes(db)
+        rng = random.Random(seed)
+        for start in range(1, ilan_count + 1, SEED_BATCH_SIZE):
+            end = min(start + SEED_BATCH_SIZE, ilan_count + 1)
+            db[COLLECTION_NAME].insert_many([make_ilan(ilan_no, rng) for ilan_no in range(start, end)])
+        db[COUNTER_COLLECTION_NAME].update_one({"_id": "ilan_id"}, {"$max": {"seq": ilan_count}}, upsert=True)
+        rebuild_ilan_facets(db)
+    finally:
+        client.close()
+
+
+def seed_users(emails, password="benchmark-sifre", is_admin=False):
+    """Kullanıcıları doğrudan veritabanına yazar ve belgelerini döndürür.
+    Hepsi aynı şifreyi kullandığı için bcrypt bir kez hesaplanır."""
+    password_hash = get_password_hash(password)
+    users = [
+        {
+            "first_name": "Benchmark",
+            "last_name": str(index),
+            "email": email,
+            "password_hash": password_hash,
+            "is_admin": is_admin,
+            "token_version": 0,
+        }
+        for index, email in enumerate(emails)
+    ]
+    client, db = sync_database()
+    try:
+        db[USER_COLLECTION_NAME].insert_many(users)
+        return users
+    finally:
+        client.close()
+
+
+def access_token(user):
+    return create_access_token(user_token_claims(user))
+
+
+@asynccontextmanager
+async def app_client(app):
+    """Uygulamayı açılış/kapanış (lifespan) dahil süreç içinde çalıştırır ve
+    ona ağ kullanmadan bağlanan bir httpx istemcisi döndürür"""
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=60) as client:
+            yield client
+
+
+def percentile(sorted_values, ratio):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * ratio))]
+
+
+def summarize(latencies, errors, elapsed):
+    latencies = sorted(latencies)
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": len(latencies) / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p95_ms": percentile(latencies, 0.95) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+    }
+
+
+async def collect_load(request, concurrency, duration):
+    """concurrency kadar eşzamanlı istemci duration saniye boyunca request()
+    çağırır. request() başarılıysa True döndürmelidir.
+    (başarılı istek gecikmeleri, hata sayısı, geçen süre) döndürür."""
+    latencies = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+
+    async def client():
+        nonlocal errors
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                ok = await request()
+            except Exception:
+                ok = False
+            if ok:
+                latencies.append(time.perf_counter() - started)
+            else:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return latencies, errors, time.perf_counter() - started
+
+
+async def run_load(request, concurrency, duration):
+    """collect_load sonucunu özetler (istek sayısı, rps, yüzdelikler)"""
+    return summarize(*await collect_load(request, concurrency, duration))
+
+
+def print_table(title, rows, columns=("requests", "errors", "rps", "p50_ms", "p95_ms", "p99_ms")):
+    """rows: (etiket, sonuç sözlüğü) çiftleri"""
+    print(f"\n{title}")
+    label_width = max([len("senaryo")] + [len(label) for label, _ in rows])
+    print("  ".join(["senaryo".ljust(label_width)] + [column.rjust(10) for column in columns]))
+    for label, result in rows:
+        cells = []
+        for column in columns:
+            value = result[column]
+            cells.append(f"{value:10.1f}" if isinstance(value, float) else f"{value:10d}")
+        print("  ".join([label.ljust(label_width)] + cells))
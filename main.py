@@ -1,16 +1,39 @@
-from pymongo import MongoClient
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
-from app.api import routers,auth,users
+from app.api import routers,auth,users,monitoring
+from app.db.database import connect_to_mongo, close_mongo_connection, get_database
+from app.db.migrations import check_schema_version
+from app.core.rate_limit import RateLimitMiddleware, create_rate_limit_backend
+from app.core.cache import start_cache_bus, close_cache_bus
 
-client = MongoClient("mongodb://localhost:27017/")
-db = client["sahiplendirme"]
-ilanlar_collection = db["ilanlar"]
+# Kova durumu worker başına bir kez oluşturulan arka uçta tutulur
+rate_limit_backend = create_rate_limit_backend()
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # MongoDB istemcisi her worker'da açılışta bir kez oluşturulur
+    await connect_to_mongo()
+    # Migration'ları çalıştırılmamış bir veritabanıyla ilk istekte değil açılışta dur
+    try:
+        await check_schema_version(get_database())
+    except RuntimeError:
+        close_mongo_connection()
+        raise
+    # Diğer worker'lardan gelen önbellek geçersiz kılma mesajlarını dinle
+    await start_cache_bus()
+    yield
+    await close_cache_bus()
+    await rate_limit_backend.close()
+    close_mongo_connection()
+
+app = FastAPI(lifespan=lifespan)
+app.add_middleware(RateLimitMiddleware, backend=rate_limit_backend)
 
 app.include_router(auth.router, prefix="/api/auth", tags=["auth"])
 app.include_router(users.router, prefix="/api/users", tags=["Kullanıcılar"])
 app.include_router(routers.router, prefix="/api/routes", tags=["İlanlar"])
+app.include_router(monitoring.router, prefix="/api/monitoring", tags=["İzleme"])
 
 
 @app.get("/")
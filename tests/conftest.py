@@ -0,0 +1,80 @@
+import asyncio
+
+import mongomock.collection
+import pytest
+from fastapi.testclient import TestClient
+from mongomock_motor import AsyncMongoMockClient
+
+from app.core.config import settings
+from app.core.security import check_ilan_permission
+from app.db import database
+from app.db.database import COLLECTION_NAME, USER_COLLECTION_NAME
+from app.models.user import get_password_hash
+
+ILAN = {
+    "tur": "Kedi",
+    "cins": "Tekir",
+    "yas": "Yavru",
+    "cinsiyet": "Dişi",
+    "saglik_durumu": "Aşıları tam",
+    "karakter_ozellikleri": "Oyuncu",
+    "bulundugu_yer": "İzmir",
+    "iletisim": "0555 000 00 00",
+    "hikaye": "Sokakta bulundu",
+}
+
+
+def mongomock_bulk_write(self, requests, ordered=True, **kwargs):
+    """mongomock'un bulk_write'ı güncel pymongo ile çalışmıyor (UpdateOne'a sort
+    parametresi eklendi); uygulamanın kullandığı UpdateOne işlemlerini tek tek uygular"""
+    for request in requests:
+        self.update_one(request._filter, request._doc, upsert=request._upsert)
+
+
+@pytest.fixture
+def mongo_client(monkeypatch):
+    """Uygulamanın MongoDB istemcisini bellek içi mongomock istemcisiyle değiştirir"""
+    client = AsyncMongoMockClient()
+    monkeypatch.setattr(mongomock.collection.Collection, "bulk_write", mongomock_bulk_write)
+    monkeypatch.setattr(database, "client", client)
+    return client
+
+
+@pytest.fixture
+def api_client(mongo_client, monkeypatch):
+    """Kimlik doğrulaması ve istek sınırlaması devre dışı bir TestClient (lifespan çalıştırılmaz)"""
+    from main import app
+
+    monkeypatch.setattr(settings, "rate_limit_enabled", False)
+    app.dependency_overrides[check_ilan_permission] = lambda: {"sub": "test@example.com", "is_admin": False}
+    try:
+        yield TestClient(app)
+    finally:
+        app.dependency_overrides.pop(check_ilan_permission, None)
+
+
+@pytest.fixture
+def insert_ilan(mongo_client):
+    """Uygulamayı atlayarak doğrudan koleksiyona bir ilan yazar"""
+    def insert_ilan(ilan_no, version=3, **fields):
+        ilan = {**ILAN, **fields, "ilan_no": ilan_no, "version": version}
+        asyncio.run(mongo_client[settings.db_name][COLLECTION_NAME].insert_one(ilan))
+        return ilan
+    return insert_ilan
+
+
+@pytest.fixture
+def create_user(mongo_client):
+    """Şifresi hashlenmiş bir kullanıcıyı doğrudan koleksiyona yazar"""
+    def create_user(email, password="gizli-sifre", **fields):
+        user = {
+            "first_name": "Test",
+            "last_name": "Kullanıcı",
+            "email": email,
+            "password_hash": get_password_hash(password),
+            "is_admin": False,
+            **fields,
+        }
+        asyncio.run(mongo_client[settings.db_name][USER_COLLECTION_NAME].insert_one(user))
+        return user
+    return create_user
@@ -0,0 +1,51 @@
+"""Refresh token rotasyonunun tek kullanımlık olduğunu ve iptallere uyduğunu doğrular"""
+import pytest
+
+
+@pytest.fixture
+def user(create_user):
+    return create_user("pamuk@example.com", password="dogru-sifre")
+
+
+@pytest.fixture
+def tokens(api_client, user):
+    response = api_client.post("/api/auth/login", data={"username": "pamuk@example.com", "password": "dogru-sifre"})
+    assert response.status_code == 200
+    return response.json()
+
+
+def refresh(client, refresh_token):
+    return client.post("/api/auth/refresh", json={"refresh_token": refresh_token})
+
+
+def test_rotated_token_can_be_used_once(api_client, tokens):
+    rotated = refresh(api_client, tokens["refresh_token"])
+    assert rotated.status_code == 200
+    assert rotated.json()["access_token"]
+    assert rotated.json()["refresh_token"] != tokens["refresh_token"]
+
+    assert refresh(api_client, rotated.json()["refresh_token"]).status_code == 200
+
+
+def test_reused_token_revokes_the_whole_family(api_client, tokens):
+    rotated = refresh(api_client, tokens["refresh_token"]).json()
+
+    # Eski token'ın tekrar gelmesi çalındığını gösterir; yenisi de geçersiz olur
+    assert refresh(api_client, tokens["refresh_token"]).status_code == 401
+    assert refresh(api_client, rotated["refresh_token"]).status_code == 401
+
+
+def test_password_change_revokes_outstanding_refresh_tokens(api_client, user, tokens, create_user):
+    create_user("yonetici@example.com", password="yonetici-sifre", is_admin=True)
+    admin = api_client.post(
+        "/api/auth/login", data={"username": "yonetici@example.com", "password": "yonetici-sifre"}
+    ).json()
+
+    response = api_client.patch(
+        f"/api/users/users/{user['_id']}",
+        json={"password": "yeni-sifre"},
+        headers={"Authorization": f"Bearer {admin['access_token']}"},
+    )
+    assert response.status_code == 200
+
+    assert refresh(api_client, tokens["refresh_token"]).status_code == 401
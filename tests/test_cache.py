@@ -0,0 +1,116 @@
+"""Önbelleğin okuma sırasında yapılan yazmalardan sonra eski değer saklamadığını doğrular"""
+import asyncio
+import uuid
+
+import pytest
+
+from app.core import security
+from app.core.cache import LocalInvalidationBus, MemoryCacheBackend, SharedCache
+
+
+class SharedMemoryBackend(MemoryCacheBackend):
+    """Testte iki worker'ın paylaştığı (Redis yerine geçen) arka uç"""
+    shared = True
+
+
+def make_workers(backend_factory):
+    """Aynı kanala bağlı iki "worker" önbelleği oluşturur; paylaşılan arka uç tek örnektir"""
+    channel = f"test-{uuid.uuid4().hex}"
+    buses = [LocalInvalidationBus(channel), LocalInvalidationBus(channel)]
+    backend = backend_factory()
+    caches = [SharedCache("users", backend if backend.shared else backend_factory(), bus) for bus in buses]
+    return buses, caches
+
+
+def test_fill_is_skipped_when_invalidated_during_read():
+    async def run():
+        buses, (cache, _) = make_workers(lambda: MemoryCacheBackend(10, 60))
+        write_seq = cache.write_seq
+        await cache.invalidate("a@example.com")
+        assert await cache.set("a@example.com", {"token_version": 0}, write_seq=write_seq) is False
+        return await cache.get("a@example.com")
+
+    assert asyncio.run(run()) is None
+
+
+@pytest.mark.parametrize("backend_factory", [
+    lambda: MemoryCacheBackend(10, 60),
+    lambda: SharedMemoryBackend(10, 60),
+], ids=["memory", "shared"])
+def test_invalidation_from_other_worker_blocks_stale_fill(backend_factory):
+    async def run():
+        buses, (worker_a, worker_b) = make_workers(backend_factory)
+        for bus in buses:
+            await bus.start()
+        try:
+            write_seq = worker_a.write_seq
+            # A eski değeri okurken B token'ı iptal eder
+            await worker_b.invalidate("uid")
+            await worker_a.set("uid", 0, write_seq=write_seq)
+            return await worker_a.get("uid"), await worker_b.get("uid")
+        finally:
+            for bus in buses:
+                await bus.close()
+
+    assert asyncio.run(run()) == (None, None)
+
+
+def test_shared_backend_late_stale_fill_is_removed_by_invalidation():
+    async def run():
+        buses, (worker_a, worker_b) = make_workers(lambda: SharedMemoryBackend(10, 60))
+        for bus in buses:
+            await bus.start()
+        try:
+            # A eski değeri B'nin silmesinden sonra, ama mesajı almadan önce yazar
+            await worker_b.backend.delete("uid")
+            await worker_a.set("uid", 0, write_seq=worker_a.write_seq)
+            await worker_b._broadcast("uid")
+            return await worker_b.get("uid")
+        finally:
+            for bus in buses:
+                await bus.close()
+
+    assert asyncio.run(run()) is None
+
+
+def test_revoked_token_version_is_not_cached(monkeypatch):
+    versions = {"uid": 0}
+
+    async def find_token_version(user_id):
+        version = versions[user_id]
+        # Okuma sürerken token'lar iptal edilir
+        versions[user_id] += 1
+        await security.token_version_cache.invalidate(user_id)
+        return version
+
+    monkeypatch.setattr(security.user_repository, "find_token_version", find_token_version)
+
+    async def run():
+        await security.token_version_cache.clear()
+        assert await security.get_token_version("uid") == 0
+        return await security.token_version_cache.get("uid")
+
+    assert asyncio.run(run()) is None
+
+
+def test_cached_user_has_no_password_hash(monkeypatch):
+    from bson import ObjectId
+
+    user_id = ObjectId()
+
+    async def find_by_email(email):
+        return {"_id": user_id, "email": email, "password_hash": "$2b$12$gizli", "token_version": 0}
+
+    monkeypatch.setattr(security.user_repository, "find_by_email", find_by_email)
+    token = security.create_access_token({"sub": "a@example.com", "token_version": 0})
+
+    async def run():
+        await security.user_cache.clear()
+        user = await security.get_current_user(token)
+        return user, await security.user_cache.get("a@example.com")
+
+    user, cached = asyncio.run(run())
+    assert user["id"] == str(user_id)
+    for fields in (user, cached):
+        assert "password_hash" not in fields
+        assert "_id" not in fields
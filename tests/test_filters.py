@@ -0,0 +1,127 @@
+"""Liste filtrelerinin yalnızca indeksle karşılanabilen birleşimlerde kabul edildiğini doğrular
+
+explain() testleri gerçek bir MongoDB gerektirir (mongomock sorgu planı üretmez);
+TEST_MONGO_URL tanımlı değilse atlanır:
+
+    TEST_MONGO_URL=mongodb://localhost:27017 python -m pytest tests/test_filters.py
+"""
+import os
+import uuid
+
+import pytest
+
+from app.db.database import COLLECTION_NAME, ILAN_FILTER_FIELDS
+from app.db.indexes import ILAN_FILTER_COMBINATIONS, ILAN_INDEXES, reconcile_indexes
+
+SUPPORTED = {
+    frozenset(),
+    frozenset({"tur"}),
+    frozenset({"tur", "cins"}),
+    frozenset({"tur", "cinsiyet"}),
+    frozenset({"tur", "yas"}),
+    frozenset({"tur", "cinsiyet", "yas"}),
+    frozenset({"cins"}),
+    frozenset({"cinsiyet"}),
+    frozenset({"yas"}),
+    frozenset({"cinsiyet", "yas"}),
+    frozenset({"bulundugu_yer"}),
+    frozenset({"bulundugu_yer", "cins"}),
+    frozenset({"bulundugu_yer", "tur"}),
+    frozenset({"bulundugu_yer", "tur", "cins"}),
+}
+
+UNSUPPORTED = [
+    {"cins": "Tekir", "cinsiyet": "Dişi"},
+    {"bulundugu_yer": "İzmir", "yas": "Yavru"},
+    {"tur": "Kedi", "cins": "Tekir", "cinsiyet": "Dişi"},
+    {"bulundugu_yer": "İzmir", "tur": "Kedi", "cinsiyet": "Dişi"},
+]
+
+VALUES = {"tur": "Kedi", "cins": "Tekir", "cinsiyet": "Dişi", "yas": "Yavru", "bulundugu_yer": "İzmir"}
+
+
+def test_filter_combinations_match_indexes():
+    assert ILAN_FILTER_COMBINATIONS == SUPPORTED
+    assert all(combination <= set(ILAN_FILTER_FIELDS) for combination in ILAN_FILTER_COMBINATIONS)
+
+
+@pytest.mark.parametrize("params", UNSUPPORTED)
+def test_unsupported_combination_is_rejected(api_client, params):
+    response = api_client.get("/api/routes/ilanlar/", params=params)
+    assert response.status_code == 400
+    assert "desteklenmiyor" in response.json()["detail"]
+
+
+@pytest.mark.parametrize("combination", sorted(SUPPORTED, key=sorted), ids=lambda c: "+".join(sorted(c)) or "none")
+def test_supported_combination_is_served(api_client, combination):
+    params = {field: VALUES[field] for field in combination}
+    response = api_client.get("/api/routes/ilanlar/", params=params)
+    assert response.status_code == 200
+    assert response.json()["items"] == []
+
+
+def test_text_search_is_not_restricted(api_client, monkeypatch):
+    from app.db.database import ilan_repository
+
+    async def search_page(*args, **kwargs):
+        return [], None
+
+    monkeypatch.setattr(ilan_repository, "search_page", search_page)
+    response = api_client.get("/api/routes/ilanlar/", params={"q": "oyuncu", "cinsiyet": "Dişi"})
+    assert response.status_code == 200
+
+
+def plan_stages(plan):
+    """Sorgu planındaki tüm aşamaları (iç içe inputStage'ler dahil) döndürür"""
+    stages = [plan]
+    for key in ("inputStage", "queryPlan"):
+        if key in plan:
+            stages += plan_stages(plan[key])
+    for child in plan.get("inputStages", []):
+        stages += plan_stages(child)
+    return stages
+
+
+@pytest.fixture(scope="module")
+def mongo_db():
+    url = os.environ.get("TEST_MONGO_URL")
+    if not url:
+        pytest.skip("explain() testleri için TEST_MONGO_URL tanımlanmalı")
+    from pymongo import MongoClient
+
+    client = MongoClient(url, serverSelectionTimeoutMS=2000)
+    db_name = f"test_filters_{uuid.uuid4().hex[:8]}"
+    db = client[db_name]
+    reconcile_indexes(db)
+    turler, cinsler, cinsiyetler, yaslar, sehirler = ["Kedi", "Köpek"], ["Tekir", "Golden"], ["Dişi", "Erkek"], ["Yavru", "Yetişkin"], ["İzmir", "Ankara"]
+    db[COLLECTION_NAME].insert_many([
+        {
+            "ilan_no": i,
+            "tur": turler[i % 2],
+            "cins": cinsler[(i // 2) % 2],
+            "cinsiyet": cinsiyetler[(i // 4) % 2],
+            "yas": yaslar[(i // 8) % 2],
+            "bulundugu_yer": sehirler[(i // 16) % 2],
+        }
+        for i in range(1, 501)
+    ])
+    yield db
+    client.drop_database(db_name)
+    client.close()
+
+
+@pytest.mark.parametrize("combination", sorted(SUPPORTED, key=sorted), ids=lambda c: "+".join(sorted(c)) or "none")
+def test_supported_combination_uses_index_scan_without_sort(mongo_db, combination):
+    filters = {field: VALUES[field] for field in combination}
+    explain = mongo_db[COLLECTION_NAME].find(filters, {"_id": 0, "ilan_no": 1}).sort("ilan_no", 1).limit(51).explain()
+    stages = plan_stages(explain["queryPlanner"]["winningPlan"])
+    names = [stage["stage"] for stage in stages]
+
+    assert "COLLSCAN" not in names
+    assert "SORT" not in names
+    index_scans = [stage for stage in stages if stage["stage"] == "IXSCAN"]
+    assert len(index_scans) == 1
+    key_fields = list(index_scans[0]["keyPattern"])
+    assert key_fields[-1] == "ilan_no"
+    assert set(key_fields[:-1]) == combination
+    assert list(index_scans[0]["keyPattern"].items()) in [spec["keys"] for spec in ILAN_INDEXES]
@@ -0,0 +1,100 @@
+"""Hazır yanıt deposunun ve liste ETag'lerinin değişiklik sayacıyla tutarlı kaldığını doğrular"""
+import asyncio
+import time
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.ilan_store import ilan_store
+from app.db.database import COLLECTION_NAME, COUNTER_COLLECTION_NAME, ilan_repository
+
+
+def bump_change_counter(mongo_client):
+    """Başka bir worker'ın yazmasını taklit eder: sayaç ilerler, bu worker'a mesaj gelmez"""
+    counters = mongo_client[settings.db_name][COUNTER_COLLECTION_NAME]
+    asyncio.run(counters.update_one({"_id": ilan_repository.change_counter_id}, {"$inc": {"seq": 1}}, upsert=True))
+
+
+def test_matching_list_etag_returns_304_without_running_the_query(api_client, insert_ilan, monkeypatch):
+    insert_ilan(9201)
+    first = api_client.get("/api/routes/ilanlar/", params={"tur": "Kedi"})
+    assert first.status_code == 200
+
+    async def find_page(*args, **kwargs):
+        raise AssertionError("liste sorgusu çalıştırılmamalı")
+
+    monkeypatch.setattr(ilan_repository, "find_page", find_page)
+    cached = api_client.get("/api/routes/ilanlar/", params={"tur": "Kedi"}, headers={"If-None-Match": first.headers["etag"]})
+
+    assert cached.status_code == 304
+    assert cached.headers["etag"] == first.headers["etag"]
+
+
+def test_store_reloads_entries_changed_behind_its_back(api_client, mongo_client, insert_ilan):
+    insert_ilan(9203)
+    first = api_client.get("/api/routes/ilanlar/", params={"after_ilan_no": 9202, "limit": 1})
+    assert first.json()["items"][0]["yas"] == "Yavru"
+
+    # Başka bir worker'daki yazmanın geçersiz kılma mesajı kaçırıldı: veritabanı ve
+    # sayaç değişti ama bu worker'ın deposu hâlâ eski gövdeyi tutuyor
+    collection = mongo_client[settings.db_name][COLLECTION_NAME]
+    asyncio.run(collection.update_one({"ilan_no": 9203}, {"$set": {"yas": "Yetişkin", "version": 4}}))
+    bump_change_counter(mongo_client)
+    stale_reloads = ilan_store.stale_reloads
+
+    refreshed = api_client.get(
+        "/api/routes/ilanlar/", params={"after_ilan_no": 9202, "limit": 1}, headers={"If-None-Match": first.headers["etag"]}
+    )
+
+    assert refreshed.status_code == 200
+    assert refreshed.headers["etag"] != first.headers["etag"]
+    assert refreshed.json()["items"][0]["yas"] == "Yetişkin"
+    assert ilan_store.stale_reloads == stale_reloads + 1
+    # Tek ilan yanıtı da depodan yenilenmiş gövdeyi verir
+    assert api_client.get("/api/routes/ilanlar/9203").headers["etag"] == '"9203-4"'
+
+
+def test_unchanged_entries_are_only_revalidated(api_client, mongo_client, insert_ilan):
+    insert_ilan(9204)
+    params = {"after_ilan_no": 9203, "limit": 1}
+    first = api_client.get("/api/routes/ilanlar/", params=params)
+    bump_change_counter(mongo_client)
+    revalidations, stale_reloads = ilan_store.revalidations, ilan_store.stale_reloads
+
+    second = api_client.get("/api/routes/ilanlar/", params=params)
+    third = api_client.get("/api/routes/ilanlar/", params=params)
+
+    assert second.content == first.content == third.content
+    # Sayaç ilerledikten sonraki ilk okuma version'ları kontrol eder, sonrakiler etmez
+    assert ilan_store.revalidations == revalidations + 1
+    assert ilan_store.stale_reloads == stale_reloads
+
+
+def test_store_is_filled_lazily_on_first_read(api_client, insert_ilan):
+    ilan = insert_ilan(9202)
+    assert ilan_store._entries.get(9202) is None
+
+    response = api_client.get("/api/routes/ilanlar/9202")
+
+    assert response.status_code == 200
+    assert response.json()["cins"] == ilan["cins"]
+    assert ilan_store._entries.get(9202) is not None
+    assert ilan_store.stats()["backend"] == "memory"
+
+
+def test_ttl_jitter_spreads_expiry_times():
+    cache = TTLCache(1000, 100, ttl_jitter=0.5)
+    now = time.monotonic()
+    for key in range(1000):
+        cache.set(key, key)
+    lifetimes = [expires_at - now for expires_at, _ in cache._data.values()]
+
+    assert all(49 <= lifetime <= 101 for lifetime in lifetimes)
+    assert max(lifetimes) - min(lifetimes) > 25
+
+
+def test_ttl_without_jitter_is_fixed():
+    cache = TTLCache(10, 100)
+    now = time.monotonic()
+    for key in range(10):
+        cache.set(key, key)
+    assert all(99 <= expires_at - now <= 101 for expires_at, _ in cache._data.values())
@@ -0,0 +1,70 @@
+"""İlan uç noktalarının yazma yapmadan yanıt verdiği durumları doğrular"""
+import asyncio
+import json
+
+from app.core.config import settings
+from app.core.ilan_store import ilan_store
+from app.db.database import COLLECTION_NAME, COUNTER_COLLECTION_NAME, ilan_repository
+from tests.conftest import ILAN
+
+
+def change_count():
+    return asyncio.run(ilan_repository.get_change_count())
+
+
+def test_empty_patch_returns_current_ilan_without_writing(api_client, mongo_client, insert_ilan):
+    insert_ilan(9101)
+
+    response = api_client.patch("/api/routes/ilanlar/9101", json={})
+
+    assert response.status_code == 200
+    assert response.json()["version"] == 3
+    assert response.json()["tur"] == "Kedi"
+    assert response.headers["etag"] == '"9101-3"'
+    stored = asyncio.run(mongo_client[settings.db_name][COLLECTION_NAME].find_one({"ilan_no": 9101}))
+    assert stored["version"] == 3
+    assert "user_id" not in stored
+    assert asyncio.run(mongo_client[settings.db_name][COUNTER_COLLECTION_NAME].find_one({})) is None
+
+
+def test_patch_with_only_null_fields_is_treated_as_empty(api_client, insert_ilan):
+    insert_ilan(9102)
+
+    response = api_client.patch("/api/routes/ilanlar/9102", json={"tur": None})
+
+    assert response.status_code == 200
+    assert response.json()["version"] == 3
+    assert change_count() == 0
+
+
+def test_empty_patch_on_missing_ilan_returns_404(api_client):
+    response = api_client.patch("/api/routes/ilanlar/9199", json={})
+    assert response.status_code == 404
+
+
+def test_written_body_matches_body_reloaded_from_database(api_client):
+    created = api_client.post("/api/routes/ilanlar/", json=ILAN)
+    assert created.status_code == 200
+    ilan_no = created.json()["ilan_no"]
+    patched = api_client.patch(f"/api/routes/ilanlar/{ilan_no}", json={"yas": "Genç"})
+    assert patched.status_code == 200
+
+    # Başka bir worker veya TTL sonrası: aynı ilan veritabanından yeniden yüklenir
+    ilan_store._entries.delete(ilan_no)
+    reloaded = api_client.get(f"/api/routes/ilanlar/{ilan_no}")
+
+    assert reloaded.headers["etag"] == patched.headers["etag"]
+    assert reloaded.content == patched.content
+
+
+def test_bulk_rejects_body_that_is_not_utf8(api_client):
+    response = api_client.post("/api/routes/ilanlar/bulk", content=b'[{"tur": "\xff"}]')
+    assert response.status_code == 400
+
+
+def test_bulk_reports_item_errors_without_empty_location(api_client):
+    response = api_client.post("/api/routes/ilanlar/bulk", content=json.dumps([ILAN, 5]).encode("utf-8"))
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert results[0]["error"] is None
+    assert results[1]["error"] and not results[1]["error"].startswith(":")
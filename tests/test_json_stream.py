@@ -0,0 +1,61 @@
+"""iter_json_array'in parça sınırlarından bağımsız çalıştığını ve eleman boyutu sınırını uyguladığını doğrular"""
+import asyncio
+import json
+from unittest import mock
+
+import pytest
+
+from app.core.json_stream import JSONStreamError, JSONStreamTooLarge, iter_json_array
+
+
+async def chunked(data, size):
+    for start in range(0, len(data), size):
+        yield data[start:start + size]
+
+
+def parse(data, chunk_size=7, **kwargs):
+    async def run():
+        return [item async for item in iter_json_array(chunked(data, chunk_size), **kwargs)]
+    return asyncio.run(run())
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 7, 1000])
+def test_elements_are_parsed_across_chunk_boundaries(chunk_size):
+    items = [{"ad": "Pamuk", "yas": 2, "kilo": 4.5}, 12.25, "İzmir", [1, 2, 3], True, None]
+    assert parse(json.dumps(items).encode("utf-8"), chunk_size) == items
+
+
+@pytest.mark.parametrize("data", [
+    b"{}", b"[1, 2", b"[1 2]", b"[1,]", b"[1] x", b'[{"tur": "\xff"}]', b'["\xc3',
+])
+def test_invalid_body_is_rejected(data):
+    with pytest.raises(JSONStreamError):
+        parse(data)
+
+
+def test_element_over_limit_is_rejected():
+    data = json.dumps([{"hikaye": "a" * 100}, {"hikaye": "a" * 10000}]).encode("utf-8")
+    with pytest.raises(JSONStreamTooLarge):
+        parse(data, chunk_size=64, max_element_size=1000)
+
+
+def test_element_over_limit_in_a_single_chunk_is_rejected():
+    data = json.dumps([{"hikaye": "a" * 10000}]).encode("utf-8")
+    with pytest.raises(JSONStreamTooLarge):
+        parse(data, chunk_size=len(data), max_element_size=1000)
+
+
+def test_small_elements_in_a_large_chunk_are_accepted():
+    items = [{"ilan": i} for i in range(1000)]
+    data = json.dumps(items).encode("utf-8")
+    assert parse(data, chunk_size=len(data), max_element_size=100) == items
+
+
+def test_large_element_is_not_reparsed_for_every_chunk():
+    data = json.dumps([{"hikaye": "a" * 100000}]).encode("utf-8")
+    decoder = json.JSONDecoder()
+    with mock.patch("app.core.json_stream.json.JSONDecoder") as decoder_class:
+        decoder_class.return_value.raw_decode = mock.Mock(side_effect=decoder.raw_decode)
+        parse(data, chunk_size=100)
+    # 1000 parça için parça başına değil, tampon ikiye katlandıkça ayrıştırılır
+    assert decoder_class.return_value.raw_decode.call_count < 20
@@ -0,0 +1,108 @@
+"""Migration kilidinin tek çalıştırmaya izin verdiğini ve yarıda kalan kilitlerin devralındığını doğrular"""
+import asyncio
+from datetime import datetime, timedelta
+
+import mongomock
+import pytest
+from mongomock_motor import AsyncMongoMockClient
+
+from app.db import migrations
+from app.db.migrations import (
+    MIGRATION_LOCK_ID,
+    MIGRATIONS_COLLECTION_NAME,
+    SCHEMA_VERSION_ID,
+    check_schema_version,
+    get_schema_version,
+    run_migrations,
+)
+
+
+@pytest.fixture
+def applied(monkeypatch):
+    """Çalıştırılan migration sürümleri"""
+    applied = []
+    monkeypatch.setattr(migrations, "MIGRATIONS", [
+        (1, "birinci", lambda db: applied.append(1)),
+        (2, "ikinci", lambda db: applied.append(2)),
+    ])
+    return applied
+
+
+@pytest.fixture
+def db():
+    return mongomock.MongoClient()["test_migrations"]
+
+
+def get_lock(db):
+    return db[MIGRATIONS_COLLECTION_NAME].find_one({"_id": MIGRATION_LOCK_ID})
+
+
+def test_migrations_run_and_release_lock(db, applied):
+    run_migrations(db)
+    assert applied == [1, 2]
+    assert get_schema_version(db) == 2
+    assert get_lock(db) is None
+
+
+def test_active_lock_blocks_second_run(db, applied):
+    now = datetime.utcnow()
+    db[MIGRATIONS_COLLECTION_NAME].insert_one(
+        {"_id": MIGRATION_LOCK_ID, "owner": "diger", "locked_at": now, "expires_at": now + timedelta(minutes=5)}
+    )
+    with pytest.raises(RuntimeError, match="Başka bir migration çalışıyor"):
+        run_migrations(db)
+    assert applied == []
+    assert get_lock(db)["owner"] == "diger"
+
+
+@pytest.mark.parametrize("stale_lock", [
+    {"owner": "olmus", "locked_at": datetime(2020, 1, 1), "expires_at": datetime(2020, 1, 1, 0, 30)},
+    {"locked_at": datetime(2020, 1, 1)},  # expires_at'i olmayan eski biçim
+])
+def test_stale_lock_is_taken_over(db, applied, stale_lock):
+    db[MIGRATIONS_COLLECTION_NAME].insert_one({"_id": MIGRATION_LOCK_ID, **stale_lock})
+    run_migrations(db)
+    assert applied == [1, 2]
+    assert get_lock(db) is None
+
+
+def test_lock_is_released_when_migration_fails(db, monkeypatch):
+    def fail(db):
+        raise ValueError("bozuk veri")
+
+    monkeypatch.setattr(migrations, "MIGRATIONS", [(1, "hatalı", fail)])
+    with pytest.raises(ValueError):
+        run_migrations(db)
+    assert get_schema_version(db) == 0
+    assert get_lock(db) is None
+
+
+def test_run_stops_when_lock_is_taken_over(db, applied, monkeypatch):
+    def steal_lock(database):
+        database[MIGRATIONS_COLLECTION_NAME].update_one({"_id": MIGRATION_LOCK_ID}, {"$set": {"owner": "diger"}})
+
+    monkeypatch.setattr(migrations, "MIGRATIONS", [(1, "uzun süren", steal_lock), (2, "ikinci", lambda db: applied.append(2))])
+    with pytest.raises(RuntimeError, match="devralındı"):
+        run_migrations(db)
+    assert applied == []
+    # Kilit yeni sahibinde kalır
+    assert get_lock(db)["owner"] == "diger"
+
+
+def set_schema_version(async_db, version):
+    asyncio.run(async_db[MIGRATIONS_COLLECTION_NAME].insert_one({"_id": SCHEMA_VERSION_ID, "version": version}))
+
+
+@pytest.mark.parametrize("version", [None, 1])
+def test_startup_check_rejects_unmigrated_database(applied, version):
+    async_db = AsyncMongoMockClient()["test_migrations"]
+    if version is not None:
+        set_schema_version(async_db, version)
+    with pytest.raises(RuntimeError, match="app.db.migrations"):
+        asyncio.run(check_schema_version(async_db))
+
+
+def test_startup_check_accepts_migrated_database(applied):
+    async_db = AsyncMongoMockClient()["test_migrations"]
+    set_schema_version(async_db, 2)
+    asyncio.run(check_schema_version(async_db))
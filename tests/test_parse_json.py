@@ -0,0 +1,25 @@
+"""parse_json'un BSON tiplerini iç içe eşleme ve dizilerde de dönüştürdüğünü doğrular"""
+from collections import OrderedDict
+from datetime import datetime
+
+from bson import ObjectId, SON
+
+from app.db.database import parse_json
+
+OBJECT_ID = ObjectId("65a1b2c3d4e5f60718293a4b")
+CREATED_AT = datetime(2024, 1, 12, 9, 30, 15, 123000)
+
+
+def test_dict_and_list_values_are_converted():
+    data = {"_id": OBJECT_ID, "etiketler": [CREATED_AT, ("a", OBJECT_ID)]}
+    assert parse_json(data) == {
+        "_id": str(OBJECT_ID),
+        "etiketler": ["2024-01-12T09:30:15.123000", ["a", str(OBJECT_ID)]],
+    }
+
+
+def test_mapping_subclasses_are_converted():
+    data = SON([("_id", OBJECT_ID), ("detay", OrderedDict(created_at=CREATED_AT))])
+    result = parse_json(data)
+    assert result == {"_id": str(OBJECT_ID), "detay": {"created_at": "2024-01-12T09:30:15.123000"}}
+    assert type(result) is dict and type(result["detay"]) is dict
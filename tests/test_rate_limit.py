@@ -0,0 +1,78 @@
+"""RateLimitMiddleware'in giriş isteklerini IP ve email'e göre sınırladığını doğrular"""
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from app.core.config import settings
+from app.core.rate_limit import RATE_LIMIT_RULES, MemoryRateLimitBackend, RateLimitRule, rate_limit_stats
+
+LOGIN = ("POST", "/api/auth/login")
+
+
+@pytest.fixture
+def limit_login(api_client, monkeypatch):
+    """Giriş kuralını küçük kapasiteli bir kuralla değiştirir ve sınırlamayı açar.
+    Kural adı her testte farklı olduğu için önceki testlerin kovaları etkilemez."""
+    assert isinstance(main.rate_limit_backend, MemoryRateLimitBackend)
+    monkeypatch.setattr(settings, "rate_limit_enabled", True)
+
+    def limit_login(capacity, email_capacity=0):
+        rule = RateLimitRule(f"login-{uuid.uuid4().hex}", capacity, period_seconds=60, email_capacity=email_capacity)
+        monkeypatch.setitem(RATE_LIMIT_RULES, LOGIN, rule)
+    return limit_login
+
+
+def login(client, email, password="yanlis-sifre"):
+    return client.post("/api/auth/login", data={"username": email, "password": password})
+
+
+def test_login_is_limited_per_email(api_client, create_user, limit_login):
+    create_user("pamuk@example.com")
+    limit_login(capacity=10, email_capacity=2)
+
+    assert login(api_client, "pamuk@example.com").status_code == 401
+    assert login(api_client, "PAMUK@example.com ").status_code == 401
+    limited = login(api_client, "pamuk@example.com")
+
+    assert limited.status_code == 429
+    assert int(limited.headers["Retry-After"]) >= 1
+    # Aynı IP'den başka bir hesaba giriş denemesi sınırlanmaz
+    assert login(api_client, "tekir@example.com").status_code == 401
+
+
+def test_login_is_limited_per_ip(api_client, limit_login):
+    limit_login(capacity=3, email_capacity=10)
+
+    for number in range(3):
+        assert login(api_client, f"kullanici{number}@example.com").status_code == 401
+    limited = login(api_client, "kullanici3@example.com")
+
+    assert limited.status_code == 429
+    assert int(limited.headers["Retry-After"]) >= 1
+    other_ip = TestClient(main.app, client=("203.0.113.7", 50000))
+    assert login(other_ip, "kullanici3@example.com").status_code == 401
+
+
+def test_buffered_form_body_reaches_login_handler(api_client, create_user, limit_login):
+    create_user("pamuk@example.com", password="dogru-sifre")
+    limit_login(capacity=10, email_capacity=5)
+
+    response = login(api_client, "pamuk@example.com", password="dogru-sifre")
+
+    assert response.status_code == 200
+    assert response.json()["access_token"]
+
+
+def test_backend_errors_fail_open(api_client, limit_login, monkeypatch):
+    async def acquire(key, capacity, refill_per_second):
+        raise ConnectionError("redis kapalı")
+
+    limit_login(capacity=1, email_capacity=1)
+    monkeypatch.setattr(main.rate_limit_backend, "acquire", acquire)
+    errors = rate_limit_stats["backend_errors"]
+
+    for _ in range(3):
+        assert login(api_client, "pamuk@example.com").status_code == 401
+    assert rate_limit_stats["backend_errors"] == errors + 6
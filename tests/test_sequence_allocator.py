@@ -0,0 +1,81 @@
+"""SequenceBlockAllocator'ın aynı sayacı paylaşan örnekler arasında değer tekrarlamadığını doğrular"""
+import asyncio
+
+import pytest
+
+from app.core.config import settings
+from app.db import database
+from app.db.database import COLLECTION_NAME, SequenceBlockAllocator
+
+EXISTING_ILAN_NO = 40
+
+
+class YieldingCollection:
+    """mongomock çağrıları event loop'a hiç dönmeden tamamlanır; her çağrıdan önce
+    araya girerek gerçek sürücüdeki gibi eşzamanlı çağrıların iç içe geçmesini sağlar"""
+
+    def __init__(self, collection):
+        self._collection = collection
+
+    def __getattr__(self, name):
+        method = getattr(self._collection, name)
+
+        async def call(*args, **kwargs):
+            await asyncio.sleep(0)
+            return await method(*args, **kwargs)
+
+        return call
+
+
+@pytest.fixture(autouse=True)
+def interleaved_collections(mongo_client, monkeypatch):
+    get_collection = database.get_collection
+    monkeypatch.setattr(database, "get_collection", lambda name: YieldingCollection(get_collection(name)))
+
+
+def make_allocators(count, block_size):
+    return [
+        SequenceBlockAllocator("test_ilan_no", block_size, COLLECTION_NAME, "ilan_no")
+        for _ in range(count)
+    ]
+
+
+async def allocate(allocators, next_calls, reserve_calls, reserve_count):
+    """Tüm örneklerde next() ve reserve() çağrılarını aynı anda başlatır, verilen tüm değerleri döndürür"""
+    async def reserve(allocator):
+        first, last = await allocator.reserve(reserve_count)
+        assert last - first + 1 == reserve_count
+        return list(range(first, last + 1))
+
+    async def next_value(allocator):
+        return [await allocator.next()]
+
+    calls = []
+    for allocator in allocators:
+        calls += [next_value(allocator) for _ in range(next_calls)]
+        calls += [reserve(allocator) for _ in range(reserve_calls)]
+    results = await asyncio.gather(*calls)
+    return [value for values in results for value in values]
+
+
+def test_concurrent_allocators_never_repeat_values(mongo_client):
+    async def run():
+        await mongo_client[settings.db_name][COLLECTION_NAME].insert_one({"ilan_no": EXISTING_ILAN_NO})
+        return await allocate(make_allocators(4, block_size=7), next_calls=50, reserve_calls=10, reserve_count=5)
+
+    values = asyncio.run(run())
+
+    assert len(values) == 4 * (50 + 10 * 5)
+    assert len(set(values)) == len(values)
+    # Sayaç koleksiyondaki en yüksek numaradan başlatılır
+    assert min(values) > EXISTING_ILAN_NO
+
+
+def test_next_hands_out_consecutive_values_within_a_block(mongo_client):
+    async def run():
+        allocator = make_allocators(1, block_size=10)[0]
+        return await asyncio.gather(*(allocator.next() for _ in range(25)))
+
+    values = asyncio.run(run())
+
+    assert sorted(values) == list(range(1, 26))
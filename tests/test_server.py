@@ -0,0 +1,60 @@
+"""Başlatıcının worker sayısını önbellek ve rate limit ayarlarıyla tutarlı seçtiğini doğrular"""
+import pytest
+
+from app import server
+from app.core.config import settings
+
+
+@pytest.fixture
+def configure(monkeypatch):
+    def configure(workers, bus="redis", rate_limit_backend="redis", cpu_count=8):
+        monkeypatch.setattr(settings, "server_workers", workers)
+        monkeypatch.setattr(settings, "cache_invalidation_bus", bus)
+        monkeypatch.setattr(settings, "rate_limit_backend", rate_limit_backend)
+        monkeypatch.setattr(server.os, "cpu_count", lambda: cpu_count)
+    return configure
+
+
+def test_defaults_to_cpu_count_with_shared_backends(configure):
+    configure(0)
+    assert server.resolve_workers() == 8
+
+
+def test_local_bus_refuses_explicit_multiple_workers(configure):
+    configure(4, bus="local")
+    with pytest.raises(ValueError, match="CACHE_INVALIDATION_BUS"):
+        server.resolve_workers()
+
+
+def test_local_bus_falls_back_to_single_worker_by_default(configure, capsys):
+    configure(0, bus="local")
+    assert server.resolve_workers() == 1
+    assert "tek worker" in capsys.readouterr().err
+
+
+def test_local_bus_allows_single_worker(configure, capsys):
+    configure(1, bus="local", rate_limit_backend="memory")
+    assert server.resolve_workers() == 1
+    assert capsys.readouterr().err == ""
+
+
+def test_memory_rate_limit_with_multiple_workers_warns(configure, capsys):
+    configure(4, rate_limit_backend="memory")
+    assert server.resolve_workers() == 4
+    assert "RATE_LIMIT_BACKEND" in capsys.readouterr().err
+
+
+def test_main_exits_on_inconsistent_settings(configure, monkeypatch):
+    configure(4, bus="local")
+    monkeypatch.setattr(server.uvicorn, "run", lambda *args, **kwargs: pytest.fail("uvicorn başlatılmamalı"))
+    with pytest.raises(SystemExit):
+        server.main()
+
+
+def test_main_passes_jitter_to_uvicorn(configure, monkeypatch):
+    configure(2)
+    calls = []
+    monkeypatch.setattr(server.uvicorn, "run", lambda *args, **kwargs: calls.append(kwargs))
+    server.main()
+    assert calls[0]["workers"] == 2
+    assert calls[0]["limit_max_requests_jitter"] == settings.server_max_requests_jitter